@@ -5,6 +5,9 @@ Main Streamlit application entry point.
 import streamlit as st
 import sys
 import os
+import importlib
+import threading
+from pathlib import Path
 
 # Add the current directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -13,6 +16,8 @@ from modules.auth import AuthManager, require_auth
 from modules.database import db
 import logging
 
+STYLE_PATH = Path(__file__).parent / ".streamlit" / "style.css"
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,34 +30,29 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource
+def load_css() -> str:
+    """Build the app <style> block once per process, with whitespace collapsed."""
+    return f"<style>{' '.join(STYLE_PATH.read_text().split())}</style>"
+
 # Custom CSS for better styling
-st.markdown("""
-<style>
-    .main-header {
-        padding: 1rem 0;
-        border-bottom: 2px solid #f0f2f6;
-        margin-bottom: 2rem;
-    }
-    .metric-card {
-        background: white;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        margin: 0.5rem 0;
-    }
-    .nav-button {
-        width: 100%;
-        margin: 0.25rem 0;
-        text-align: left;
-    }
-    .user-info {
-        background: #f8f9fa;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin-bottom: 1rem;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.html(load_css())
+
+# Page key -> (module, render function) for the main content area
+PAGES = {
+    'profile': ('pages.profile', 'render_profile_content'),
+    'workouts': ('pages.workouts', 'render_workouts_content'),
+    'diet': ('pages.diet', 'render_diet_content'),
+    'progress': ('pages.progress', 'render_progress_content')
+}
+
+# Sidebar navigation entries (page key -> label)
+NAV_PAGES = {
+    'profile': "👤 Profile",
+    'workouts': "💪 Workouts",
+    'diet': "🥗 Diet & Nutrition",
+    'progress': "📈 Progress"
+}
 
 def main():
     """Main application entry point."""
@@ -60,6 +60,9 @@ def main():
         # Initialize session state
         AuthManager.initialize_session_state()
         
+        # Warm up page imports while the user is still logging in
+        preload_pages()
+        
         # Check if user is authenticated
         if not AuthManager.is_authenticated():
             AuthManager.render_auth_form()
@@ -80,17 +83,7 @@ def render_main_dashboard():
         
         # Main content area
         current_page = st.session_state.get('current_page', 'profile')
-        
-        if current_page == 'profile':
-            render_profile_page()
-        elif current_page == 'workouts':
-            render_workouts_page()
-        elif current_page == 'diet':
-            render_diet_page()
-        elif current_page == 'progress':
-            render_progress_page()
-        else:
-            render_profile_page()
+        render_page(current_page)
             
     except Exception as e:
         logger.error(f"Error rendering dashboard: {e}")
@@ -98,81 +91,56 @@ def render_main_dashboard():
 
 def render_sidebar():
     """Render the sidebar with navigation and user info."""
-    user = AuthManager.get_current_user()
-    
     with st.sidebar:
-        st.markdown('<div class="sidebar-content">', unsafe_allow_html=True)
-        
         # User greeting
-        st.markdown(f"### Welcome, {user.get('first_name', user.get('username'))}! 👋")
+        st.markdown(f"### Welcome, {st.session_state.display_name}! 👋")
         
         # Navigation menu
         st.markdown("---")
         st.markdown("### 📊 Navigation")
         
-        # Navigation buttons
-        if st.button("👤 Profile", use_container_width=True, 
-                    type="primary" if st.session_state.get('current_page') == 'profile' else "secondary"):
-            st.session_state.current_page = 'profile'
-            st.rerun()
-        
-        if st.button("💪 Workouts", use_container_width=True,
-                    type="primary" if st.session_state.get('current_page') == 'workouts' else "secondary"):
-            st.session_state.current_page = 'workouts'
-            st.rerun()
-        
-        if st.button("🥗 Diet & Nutrition", use_container_width=True,
-                    type="primary" if st.session_state.get('current_page') == 'diet' else "secondary"):
-            st.session_state.current_page = 'diet'
-            st.rerun()
-        
-        if st.button("📈 Progress", use_container_width=True,
-                    type="primary" if st.session_state.get('current_page') == 'progress' else "secondary"):
-            st.session_state.current_page = 'progress'
-            st.rerun()
+        # Navigation menu; the selection is stored directly in session state
+        st.radio(
+            "Navigation",
+            list(NAV_PAGES),
+            key="current_page",
+            format_func=NAV_PAGES.get,
+            label_visibility="collapsed"
+        )
         
         st.markdown("---")
         
         # Logout button
-        if st.button("🚪 Logout", key="nav_logout", help="Sign out of your account"):
-            AuthManager.logout_user()
-            st.rerun()
+        st.button("🚪 Logout", key="nav_logout", help="Sign out of your account",
+                  on_click=AuthManager.logout_user)
 
-def render_profile_page():
-    """Render the user profile page."""
-    try:
-        from pages.profile import render_profile_content
-        render_profile_content()
-    except Exception as e:
-        logger.error(f"Error rendering profile page: {e}")
-        st.error("Error loading profile page")
+@st.fragment
+def render_page(page: str):
+    """
+    Render the main content of a dashboard page.
 
-def render_workouts_page():
-    """Render the workouts page."""
+    Runs as a fragment, so widget interactions inside a page rerun only the
+    page body rather than the whole script (auth check, CSS, sidebar).
+    Navigation and st.rerun() calls still trigger a full app rerun.
+    """
+    module_name, function_name = PAGES.get(page, PAGES['profile'])
     try:
-        from pages.workouts import render_workouts_content
-        render_workouts_content()
+        render_content = getattr(importlib.import_module(module_name), function_name)
+        render_content()
     except Exception as e:
-        logger.error(f"Error rendering workouts page: {e}")
-        st.error("Error loading workouts page")
+        logger.error(f"Error rendering {page} page: {e}")
+        st.error(f"Error loading {page} page")
 
-def render_diet_page():
-    """Render the diet and nutrition page."""
-    try:
-        from pages.diet import render_diet_content
-        render_diet_content()
-    except Exception as e:
-        logger.error(f"Error rendering diet page: {e}")
-        st.error("Error loading diet page")
+@st.cache_resource
+def preload_pages() -> threading.Thread:
+    """Import the page modules (and their heavy dependencies) in the background, once per process."""
+    def import_pages():
+        for module_name, _ in PAGES.values():
+            importlib.import_module(module_name)
 
-def render_progress_page():
-    """Render the progress tracking page."""
-    try:
-        from pages.progress import render_progress_content
-        render_progress_content()
-    except Exception as e:
-        logger.error(f"Error rendering progress page: {e}")
-        st.error("Error loading progress page")
+    thread = threading.Thread(target=import_pages, name="page-preload", daemon=True)
+    thread.start()
+    return thread
 
 if __name__ == "__main__":
     main()
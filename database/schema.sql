@@ -22,7 +22,7 @@ CREATE TABLE IF NOT EXISTS user_sessions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER NOT NULL,
     session_token TEXT UNIQUE NOT NULL,
-    expires_at TIMESTAMP NOT NULL,
+    expires_at INTEGER NOT NULL,  -- unix seconds
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users (id)
 );
@@ -77,6 +77,7 @@ CREATE TABLE IF NOT EXISTS workout_logs (
     plan_name TEXT NOT NULL,
     workout_day_id INTEGER NOT NULL,
     completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_on DATE GENERATED ALWAYS AS (DATE(completed_at)) VIRTUAL,
     duration_minutes INTEGER,
     notes TEXT,
     FOREIGN KEY (user_id) REFERENCES users (id),
@@ -90,6 +91,7 @@ CREATE TABLE IF NOT EXISTS exercise_logs (
     exercise_id INTEGER NOT NULL,
     sets_completed INTEGER,
     reps_completed TEXT,
+    reps_int INTEGER,  -- reps_completed as a number, for volume totals
     weight_used_kg REAL,
     perceived_exertion INTEGER,
     notes TEXT,
@@ -156,6 +158,7 @@ CREATE TABLE IF NOT EXISTS meal_logs (
     carbs_g REAL,
     fat_g REAL,
     logged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    logged_on DATE GENERATED ALWAYS AS (DATE(logged_at)) VIRTUAL,
     FOREIGN KEY (user_id) REFERENCES users (id),
     FOREIGN KEY (meal_plan_id) REFERENCES meal_plans (id)
 );
@@ -174,3 +177,49 @@ CREATE TABLE IF NOT EXISTS shopping_lists (
     FOREIGN KEY (diet_plan_id) REFERENCES diet_plans (id)
 );
 
+-- Per-day lookups for the nutrition and workout history charts
+CREATE INDEX IF NOT EXISTS idx_meal_logs_user_day ON meal_logs (user_id, logged_on);
+CREATE INDEX IF NOT EXISTS idx_workout_logs_user_day ON workout_logs (user_id, completed_on);
+
+-- Session validation reads token, expiry and user id from the index alone
+CREATE INDEX IF NOT EXISTS idx_sessions_token_expiry ON user_sessions (session_token, expires_at, user_id);
+
+-- Diet plan listing, detail and delete lookups
+CREATE INDEX IF NOT EXISTS idx_diet_plans_user_created ON diet_plans (user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_meal_plans_diet_day ON meal_plans (diet_plan_id, day_number, meal_type);
+CREATE INDEX IF NOT EXISTS idx_shopping_lists_diet ON shopping_lists (diet_plan_id, category, item_name);
+
+-- Deleting a diet plan removes its meals and shopping list in the same statement.
+-- A trigger rather than ON DELETE CASCADE, so existing databases pick it up
+-- without rebuilding the child tables or enabling foreign key enforcement.
+CREATE TRIGGER IF NOT EXISTS trg_diet_plans_delete
+AFTER DELETE ON diet_plans
+BEGIN
+    DELETE FROM meal_plans WHERE diet_plan_id = OLD.id;
+    DELETE FROM shopping_lists WHERE diet_plan_id = OLD.id;
+END;
+
+-- Deleting a workout plan removes its days, exercises, logs and exercise logs
+CREATE INDEX IF NOT EXISTS idx_workout_days_plan ON workout_days (workout_plan_id, day_number);
+CREATE INDEX IF NOT EXISTS idx_workout_exercises_day ON workout_exercises (workout_day_id);
+CREATE INDEX IF NOT EXISTS idx_workout_logs_day ON workout_logs (workout_day_id);
+CREATE INDEX IF NOT EXISTS idx_exercise_logs_log ON exercise_logs (workout_log_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_workout_plans_delete
+AFTER DELETE ON workout_plans
+BEGIN
+    DELETE FROM workout_days WHERE workout_plan_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_workout_days_delete
+AFTER DELETE ON workout_days
+BEGIN
+    DELETE FROM workout_exercises WHERE workout_day_id = OLD.id;
+    DELETE FROM workout_logs WHERE workout_day_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_workout_logs_delete
+AFTER DELETE ON workout_logs
+BEGIN
+    DELETE FROM exercise_logs WHERE workout_log_id = OLD.id;
+END;
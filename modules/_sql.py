@@ -0,0 +1,175 @@
+"""
+SQL statements used by the database module.
+Kept as module-level constants so each statement has one exact text and
+hits the per-connection statement cache.
+"""
+
+# Users
+SQL_FIND_USER_ID = "SELECT id FROM users WHERE username = ? OR email = ?"
+SQL_INSERT_USER = """
+INSERT INTO users (username, email, password_hash, first_name,
+                   last_name, age, gender, height_cm, weight_kg,
+                   activity_level, fitness_goals, injuries, experience_level)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_SELECT_LOGIN = """
+SELECT id, password_hash FROM users WHERE username = ?
+UNION ALL
+SELECT id, password_hash FROM users WHERE email = ? AND username <> ?
+LIMIT 1
+"""
+SQL_SELECT_USER = """
+SELECT id, username, email, first_name, last_name, age, gender, height_cm,
+       weight_kg, activity_level, fitness_goals, injuries, experience_level, created_at
+FROM users WHERE id = ?
+"""
+SQL_UPDATE_USER_PROFILE = "UPDATE users SET {assignments} WHERE id = ?"
+SQL_SELECT_USER_COUNTS = """
+SELECT
+    (SELECT COUNT(*) FROM workout_plans WHERE user_id = ?),
+    (SELECT COUNT(*) FROM diet_plans WHERE user_id = ?),
+    (SELECT COUNT(*) FROM food_inventory WHERE user_id = ?)
+"""
+
+# Sessions
+SQL_INSERT_SESSION = """
+INSERT INTO user_sessions (user_id, session_token, expires_at)
+VALUES (?, ?, ?)
+"""
+SQL_SELECT_SESSION_USER = """
+SELECT u.id, u.username, u.email, u.first_name, u.last_name, u.age, u.gender,
+       u.height_cm, u.weight_kg, u.activity_level, u.fitness_goals, u.injuries,
+       u.experience_level, u.created_at, s.expires_at AS session_expires_at
+FROM users u
+JOIN user_sessions s ON u.id = s.user_id
+WHERE s.session_token = ? AND s.expires_at > ?
+"""
+
+# Workout plans
+SQL_INSERT_WORKOUT_PLAN = """
+INSERT INTO workout_plans (user_id, name, description, duration_weeks,
+                           ai_generated)
+VALUES (?, ?, ?, ?, ?)
+"""
+SQL_INSERT_WORKOUT_DAY = """
+INSERT INTO workout_days (workout_plan_id, day_number, day_name, focus_area)
+VALUES (?, ?, ?, ?)
+"""
+SQL_SELECT_WORKOUT_DAY_IDS = "SELECT id FROM workout_days WHERE workout_plan_id = ? ORDER BY id"
+SQL_INSERT_EXERCISE = """
+INSERT OR IGNORE INTO exercises (name, category, muscle_groups,
+                                 equipment, difficulty_level, instructions)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+SQL_SELECT_EXERCISE_IDS = "SELECT name, MIN(id) FROM exercises WHERE name IN ({placeholders}) GROUP BY name"
+SQL_INSERT_WORKOUT_EXERCISE = """
+INSERT INTO workout_exercises (workout_day_id, exercise_id, sets,
+                               reps, weight_kg, rest_seconds, notes)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_SELECT_WORKOUT_PLANS = """
+SELECT * FROM workout_plans
+WHERE user_id = ?
+ORDER BY created_at DESC
+"""
+SQL_SELECT_DAY_EXERCISES = """
+SELECT e.*, we.sets, we.reps, we.weight_kg, we.rest_seconds, we.notes AS exercise_notes
+FROM exercises e
+JOIN workout_exercises we ON e.id = we.exercise_id
+WHERE we.workout_day_id = ?
+"""
+
+# Diet plans
+SQL_INSERT_DIET_PLAN = """
+INSERT INTO diet_plans (user_id, name, calorie_target, protein_target_g,
+                        carb_target_g, fat_target_g, dietary_restrictions,
+                        ai_generated)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_INSERT_MEAL_PLAN = """
+INSERT INTO meal_plans (diet_plan_id, day_number, meal_type,
+                        recipe_name, ingredients, instructions,
+                        calories_per_serving, protein_g, carbs_g,
+                        fat_g, servings)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_INSERT_SHOPPING_ITEM = """
+INSERT INTO shopping_lists (user_id, diet_plan_id, item_name,
+                            quantity, unit, category)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+SQL_SELECT_DIET_PLANS = """
+SELECT * FROM diet_plans
+WHERE user_id = ?
+ORDER BY created_at DESC
+"""
+
+# Food inventory and meal logs
+SQL_SELECT_FOODS = "SELECT food_name FROM food_inventory WHERE user_id = ?"
+SQL_INSERT_FOOD = "INSERT OR IGNORE INTO food_inventory (user_id, food_name) VALUES (?, ?)"
+SQL_INSERT_MEAL_LOG = """
+INSERT INTO meal_logs
+(user_id, meal_type, food_items, calories_consumed, protein_g, carbs_g, fat_g)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_SELECT_NUTRITION_LOGS = """
+SELECT
+    ml.logged_on AS date,
+    SUM(ml.calories_consumed) AS calories,
+    SUM(ml.protein_g) AS protein,
+    SUM(ml.carbs_g) AS carbs,
+    SUM(ml.fat_g) AS fats,
+    (SELECT calorie_target
+     FROM diet_plans
+     WHERE user_id = ?
+     ORDER BY created_at DESC
+     LIMIT 1) AS target_calories
+FROM meal_logs ml
+WHERE ml.user_id = ? AND ml.logged_on >= ?
+GROUP BY ml.logged_on
+ORDER BY ml.logged_on ASC
+"""
+
+SQL_SELECT_NUTRITION_FOR_DATE = """
+SELECT
+    SUM(ml.calories_consumed) AS calories,
+    SUM(ml.protein_g) AS protein,
+    SUM(ml.carbs_g) AS carbs,
+    SUM(ml.fat_g) AS fats,
+    (SELECT calorie_target
+     FROM diet_plans
+     WHERE user_id = ?
+     ORDER BY created_at DESC
+     LIMIT 1) AS target_calories
+FROM meal_logs ml
+WHERE ml.user_id = ? AND ml.logged_on = ?
+GROUP BY ml.logged_on
+"""
+
+# Workout history and progress
+SQL_SELECT_WORKOUT_HISTORY = """
+SELECT
+    wl.completed_at AS date,
+    wl.plan_name AS name,
+    wd.day_number AS day_number,
+    SUM(el.sets_completed * el.reps_int * el.weight_used_kg) AS volume,
+    COUNT(DISTINCT wl.id) AS sessions,
+    AVG(wl.duration_minutes) AS duration,
+    1.0 AS completion_rate
+FROM workout_logs wl
+JOIN exercise_logs el ON wl.id = el.workout_log_id
+JOIN workout_days wd ON wl.workout_day_id = wd.id
+WHERE wl.user_id = ? AND wl.completed_on >= ?
+GROUP BY wl.completed_on, wl.plan_name, wd.day_number
+ORDER BY wl.completed_on ASC
+"""
+SQL_SELECT_BODY_METRICS = """
+SELECT height_cm, weight_kg, date
+FROM progress_tracking
+WHERE user_id = ?
+ORDER BY date ASC
+"""
+SQL_INSERT_PROGRESS = """
+INSERT INTO progress_tracking (user_id, weight_kg, height_cm, date)
+VALUES (?, ?, ?, ?)
+"""
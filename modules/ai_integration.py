@@ -1,179 +1,40 @@
 
 import os
-import json
+import orjson
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List
+import functools
+from collections import ChainMap
+from typing import Dict, Any, Optional, List, Iterator
 from google import genai
 from google.genai import types
 import streamlit as st
 from dotenv import load_dotenv
-load_dotenv()
 logger = logging.getLogger(__name__)
 
-class GeminiClient:
-    """Handles Gemini API interactions for fitness and nutrition planning."""
-    
-    def __init__(self):
-        """Initialize the Gemini client."""
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        if not self.api_key:
-            logger.warning("GEMINI_API_KEY not found in environment variables")
-            return
-            
-        try:
-            self.client = genai.Client(api_key=self.api_key)
-            logger.info("Gemini client initialized successfully")
-        except Exception as e:
-            logger.error(f"Error initializing Gemini client: {e}")
-            self.client = None
-    
-    def is_available(self) -> bool:
-        """Check if Gemini API is available."""
-        return self.client is not None and self.api_key is not None
-    
-    def generate_workout_plan(self, user_profile: Dict[str, Any], 
-                            preferences: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
-        """
-        Generate a personalized workout plan using Gemini.
-        
-        Args:
-            user_profile: User's physical and fitness profile
-            preferences: Additional workout preferences
-            
-        Returns:
-            Generated workout plan or None if failed
-        """
-        if not self.is_available():
-            logger.error("Gemini API not available")
-            return None
-        
-        try:
-            prompt = self._create_workout_prompt(user_profile, preferences)
-            
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.7,
-                    top_p=0.9,
-                )
-            )
-            # Parse the response
-            workout_plan = self._parse_workout_response(response.text)
-            if workout_plan:
-                workout_plan['gemini_prompt'] = prompt[:500]  # Store truncated prompt
-                logger.info("Workout plan generated successfully")
-                workout_plan['name']=preferences['name']
-                return workout_plan
-            else:
-                logger.error("Failed to parse workout plan response")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error generating workout plan: {e}")
-            return None
-    
-    def generate_diet_plan(self, user_profile: Dict[str, Any], 
-                          available_foods: List[str], 
-                          dietary_goals: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """
-        Generate a personalized diet plan using Gemini.
-        
-        Args:
-            user_profile: User's profile information
-            available_foods: List of available food items
-            dietary_goals: Dietary goals and restrictions
-            
-        Returns:
-            Generated diet plan or None if failed
-        """
-        if not self.is_available():
-            logger.error("Gemini API not available")
-            return None
-        
-        try:
-            prompt = self._create_diet_prompt(user_profile, available_foods, dietary_goals)
-            
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.7,
-                    top_p=0.9,
-                )
-            )
-            
-            # Parse the response
-            diet_plan = self._parse_diet_response(response.text)
-            if diet_plan:
-                diet_plan['gemini_prompt'] = prompt[:500]
-                diet_plan['name']=dietary_goals['name']
-                logger.info("Diet plan generated successfully")
-                return diet_plan
-            else:
-                logger.error("Failed to parse diet plan response")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error generating diet plan: {e}")
-            return None
-    
-    def get_fitness_advice(self, question: str, user_context: Dict[str, Any] = None) -> Optional[str]:
-        """
-        Get fitness advice using Gemini.
-        
-        Args:
-            question: User's fitness question
-            user_context: Optional user context for personalized advice
-            
-        Returns:
-            AI-generated advice or None if failed
-        """
-        if not self.is_available():
-            return "Gemini API is not available. Please configure GEMINI_API_KEY."
-        
-        try:
-            prompt = self._create_advice_prompt(question, user_context)
-            
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.8,
-                    top_p=0.9,
-                )
-            )
-            
-            return response.text
-            
-        except Exception as e:
-            logger.error(f"Error getting fitness advice: {e}")
-            return f"Error getting advice: {str(e)}"
-    
-    def _create_workout_prompt(self, user_profile: Dict[str, Any], 
-                              preferences: Dict[str, Any] = None) -> str:
-        """Create a detailed workout generation prompt."""
-        preferences = preferences or {}
-        
-        prompt = f"""
+GEMINI_MODEL = 'gemini-2.5-flash'
+
+# Prompt templates, filled with str.format_map over a ChainMap of the request
+# dicts and the matching defaults (double braces are literal JSON braces).
+_WORKOUT_PROMPT = """
 You are a certified personal trainer and exercise physiologist with over 15 years of experience. 
 Create a comprehensive, personalized 4-week workout plan for the following client:
 
 USER PROFILE:
-- Age: {user_profile.get('age', 'Unknown')}
-- Gender: {user_profile.get('gender', 'Unknown')}
-- Height: {user_profile.get('height_cm', 'Unknown')} cm
-- Weight: {user_profile.get('weight_kg', 'Unknown')} kg
-- Activity Level: {user_profile.get('activity_level', 'Unknown')}
-- Experience Level: {user_profile.get('experience_level', 'Beginner')}
-- Fitness Goals: {user_profile.get('fitness_goals', 'General fitness')}
-- Injuries/Limitations: {user_profile.get('injuries', 'None specified')}
+- Age: {age}
+- Gender: {gender}
+- Height: {height_cm} cm
+- Weight: {weight_kg} kg
+- Activity Level: {activity_level}
+- Experience Level: {experience_level}
+- Fitness Goals: {fitness_goals}
+- Injuries/Limitations: {injuries}
 
 WORKOUT PREFERENCES:
-- Days per week: {preferences.get('days_per_week', 4)}
-- Session duration: {preferences.get('session_duration', '45-60 minutes')}
-- Preferred equipment: {preferences.get('equipment', 'Full gym access')}
-- Workout type focus: {preferences.get('workout_type', 'Balanced strength and cardio')}
+- Days per week: {days_per_week}
+- Session duration: {session_duration}
+- Preferred equipment: {equipment}
+- Workout type focus: {workout_type}
 
 REQUIREMENTS:
 1. Create a 4-week progressive program with weekly variations
@@ -214,35 +75,44 @@ FORMAT YOUR RESPONSE AS JSON:
 
 Provide a complete, detailed plan that follows these specifications exactly.
 """
-        return prompt
-    
-    def _create_diet_prompt(self, user_profile: Dict[str, Any], 
-                           available_foods: List[str], 
-                           dietary_goals: Dict[str, Any]) -> str:
-        """Create a detailed diet planning prompt."""
-        
-        prompt = f"""
+
+_WORKOUT_DEFAULTS = {
+    'age': 'Unknown',
+    'gender': 'Unknown',
+    'height_cm': 'Unknown',
+    'weight_kg': 'Unknown',
+    'activity_level': 'Unknown',
+    'experience_level': 'Beginner',
+    'fitness_goals': 'General fitness',
+    'injuries': 'None specified',
+    'days_per_week': 4,
+    'session_duration': '45-60 minutes',
+    'equipment': 'Full gym access',
+    'workout_type': 'Balanced strength and cardio',
+}
+
+_DIET_PROMPT = """
         You are a registered dietitian and sports nutritionist with expertise in meal planning. 
         Create a comprehensive 7-day meal plan for the following client:
 
         USER PROFILE:
-        - Age: {user_profile.get('age', 'Unknown')}
-        - Gender: {user_profile.get('gender', 'Unknown')}
-        - Height: {user_profile.get('height_cm', 'Unknown')} cm
-        - Weight: {user_profile.get('weight_kg', 'Unknown')} kg
-        - Activity Level: {user_profile.get('activity_level', 'Unknown')}
-        - Fitness Goals: {user_profile.get('fitness_goals', 'General health')}
+        - Age: {age}
+        - Gender: {gender}
+        - Height: {height_cm} cm
+        - Weight: {weight_kg} kg
+        - Activity Level: {activity_level}
+        - Fitness Goals: {fitness_goals}
 
         AVAILABLE FOODS:
-        {', '.join(available_foods) if available_foods else 'Standard grocery items'}
+        {available_foods}
 
         DIETARY GOALS:
-        - Calorie Target: {dietary_goals.get('calorie_target', 'Calculate based on profile')}
-        - Protein Goal: {dietary_goals.get('protein_target', 'Calculate based on goals')}g
-        - Carb Goal: {dietary_goals.get('carb_target', 'Balanced')}g
-        - Fat Goal: {dietary_goals.get('fat_target', 'Balanced')}g
-        - Dietary Restrictions: {dietary_goals.get('restrictions', 'None')}
-        - Meal Frequency: {dietary_goals.get('meals_per_day', 3)} meals + {dietary_goals.get('snacks_per_day', 1)} snacks
+        - Calorie Target: {calorie_target}
+        - Protein Goal: {protein_target}g
+        - Carb Goal: {carb_target}g
+        - Fat Goal: {fat_target}g
+        - Dietary Restrictions: {restrictions}
+        - Meal Frequency: {meals_per_day} meals + {snacks_per_day} snacks
 
         REQUIREMENTS:
         1. Create 7 days of complete meal plans
@@ -288,25 +158,42 @@ Provide a complete, detailed plan that follows these specifications exactly.
 
         Provide a complete, nutritionally balanced plan that maximizes the use of available foods.
         """
-        return prompt
-    
-    def _create_advice_prompt(self, question: str, user_context: Dict[str, Any] = None) -> str:
-        """Create a prompt for general fitness advice."""
-        context_str = ""
-        if user_context:
-            context_str = f"""
+
+_DIET_DEFAULTS = {
+    'age': 'Unknown',
+    'gender': 'Unknown',
+    'height_cm': 'Unknown',
+    'weight_kg': 'Unknown',
+    'activity_level': 'Unknown',
+    'fitness_goals': 'General health',
+    'calorie_target': 'Calculate based on profile',
+    'protein_target': 'Calculate based on goals',
+    'carb_target': 'Balanced',
+    'fat_target': 'Balanced',
+    'restrictions': 'None',
+    'meals_per_day': 3,
+    'snacks_per_day': 1,
+}
+
+_ADVICE_CONTEXT = """
 USER CONTEXT:
-- Goals: {user_context.get('fitness_goals', 'General fitness')}
-- Experience: {user_context.get('experience_level', 'Beginner')}
-- Current focus: {user_context.get('current_focus', 'Overall health')}
+- Goals: {fitness_goals}
+- Experience: {experience_level}
+- Current focus: {current_focus}
 """
-        
-        prompt = f"""
+
+_ADVICE_DEFAULTS = {
+    'fitness_goals': 'General fitness',
+    'experience_level': 'Beginner',
+    'current_focus': 'Overall health',
+}
+
+_ADVICE_PROMPT = """
 You are a certified personal trainer, nutritionist, and wellness coach. Provide helpful, 
 evidence-based advice for the following fitness question. Be supportive, encouraging, 
 and provide actionable recommendations.
 
-{context_str}
+{context}
 
 QUESTION: {question}
 
@@ -318,54 +205,324 @@ Please provide a comprehensive answer that includes:
 
 Keep your response informative but conversational and supportive.
 """
-        return prompt
+
+
+def _log_prompt(prompt: str) -> None:
+    """Log a short digest of a prompt for debugging instead of storing it with the plan."""
+    if logger.isEnabledFor(logging.DEBUG):
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+        logger.debug(f"Gemini prompt hash={digest} preview={prompt[:200]!r}")
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env() -> bool:
+    """Load variables from .env into the process environment, once per process."""
+    return load_dotenv()
+
+
+def _is_list_of_dicts(value: Any) -> bool:
+    """Return True if value is a list whose items are all dicts."""
+    return isinstance(value, list) and all(isinstance(item, dict) for item in value)
+
+
+def _is_valid_workout_plan(plan: Any) -> bool:
+    """Check that a parsed workout plan has the structure the app saves and renders."""
+    return (
+        isinstance(plan, dict)
+        and isinstance(plan.get('name'), str)
+        and isinstance(plan.get('description'), str)
+        and _is_list_of_dicts(plan.get('days'))
+        and all(_is_list_of_dicts(day.get('exercises', [])) for day in plan['days'])
+        and all(isinstance(exercise.get('name'), str)
+                for day in plan['days'] for exercise in day.get('exercises', []))
+    )
+
+
+def _is_valid_diet_plan(plan: Any) -> bool:
+    """Check that a parsed diet plan has the structure the app saves and renders."""
+    return (
+        isinstance(plan, dict)
+        and isinstance(plan.get('name'), str)
+        and _is_list_of_dicts(plan.get('meals'))
+        and _is_list_of_dicts(plan.get('shopping_list', []))
+    )
+
+
+def _extract_first_json_object(text: str) -> Optional[str]:
+    """
+    Return the first balanced JSON object in text, or None if there is none.
+
+    Walks the text once tracking brace depth, skipping braces inside string
+    literals, so prose or stray braces after the object are ignored.
+    """
+    # Skip the opening line of a ```json fence
+    if text.startswith("```"):
+        text = text[text.find('\n') + 1:]
+
+    start = text.find('{')
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+class GeminiClient:
+    """Handles Gemini API interactions for fitness and nutrition planning."""
+
+    # Generation settings, built once and shared by every request
+    _PLAN_CFG = types.GenerateContentConfig(temperature=0.7, top_p=0.9)
+    _ADVICE_CFG = types.GenerateContentConfig(temperature=0.8, top_p=0.9)
     
+    def __init__(self):
+        """Initialize the Gemini client settings; the API client is built lazily."""
+        _load_env()
+        self.api_key = os.getenv('GEMINI_API_KEY')
+        if not self.api_key:
+            logger.warning("GEMINI_API_KEY not found in environment variables")
+
+    @functools.cached_property
+    def client(self) -> Optional[genai.Client]:
+        """Create the underlying genai client on first use."""
+        if not self.api_key:
+            return None
+
+        try:
+            client = genai.Client(api_key=self.api_key)
+            logger.info("Gemini client initialized successfully")
+            return client
+        except Exception as e:
+            logger.error(f"Error initializing Gemini client: {e}")
+            return None
+    
+    def is_available(self) -> bool:
+        """Check if Gemini API is available."""
+        return self.client is not None and self.api_key is not None
+    
+    def generate_workout_plan(self, user_profile: Dict[str, Any], 
+                            preferences: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """
+        Generate a personalized workout plan using Gemini.
+        
+        Args:
+            user_profile: User's physical and fitness profile
+            preferences: Additional workout preferences
+            
+        Returns:
+            Generated workout plan or None if failed
+        """
+        if not self.is_available():
+            logger.error("Gemini API not available")
+            return None
+        
+        try:
+            prompt = self._create_workout_prompt(user_profile, preferences)
+            _log_prompt(prompt)
+            
+            response_text = _cached_generate(prompt, GEMINI_MODEL, '_PLAN_CFG')
+            return self._build_workout_plan(response_text, preferences)
+                
+        except Exception as e:
+            logger.error(f"Error generating workout plan: {e}")
+            return None
+    
+    def generate_diet_plan(self, prompt: str,
+                          dietary_goals: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Generate a personalized diet plan using Gemini.
+        
+        Calls Gemini directly rather than through _cached_generate, so it makes
+        no Streamlit calls and the diet page can run it on a worker thread.
+        
+        Args:
+            prompt: Prompt built by create_diet_prompt
+            dietary_goals: Dietary goals and restrictions
+            
+        Returns:
+            Generated diet plan or None if failed
+        """
+        if not self.is_available():
+            logger.error("Gemini API not available")
+            return None
+        
+        try:
+            _log_prompt(prompt)
+            
+            response = self.client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config=self._PLAN_CFG
+            )
+            return self._build_diet_plan(response.text, dietary_goals)
+                
+        except Exception as e:
+            logger.error(f"Error generating diet plan: {e}")
+            return None
+    
+    def get_fitness_advice(self, question: str, user_context: Dict[str, Any] = None) -> Optional[str]:
+        """
+        Get fitness advice using Gemini.
+        
+        Args:
+            question: User's fitness question
+            user_context: Optional user context for personalized advice
+            
+        Returns:
+            AI-generated advice or None if failed
+        """
+        if not self.is_available():
+            return "Gemini API is not available. Please configure GEMINI_API_KEY."
+        
+        try:
+            prompt = self._create_advice_prompt(question, user_context)
+            
+            return _cached_generate(prompt, GEMINI_MODEL, '_ADVICE_CFG')
+            
+        except Exception as e:
+            logger.error(f"Error getting fitness advice: {e}")
+            return f"Error getting advice: {str(e)}"
+
+    def get_fitness_advice_stream(self, question: str,
+                                  user_context: Dict[str, Any] = None) -> Iterator[str]:
+        """
+        Stream fitness advice from Gemini as it is generated.
+        
+        Args:
+            question: User's fitness question
+            user_context: Optional user context for personalized advice
+            
+        Yields:
+            Chunks of AI-generated advice text
+        """
+        if not self.is_available():
+            yield "Gemini API is not available. Please configure GEMINI_API_KEY."
+            return
+        
+        try:
+            prompt = self._create_advice_prompt(question, user_context)
+            
+            response = self.client.models.generate_content_stream(
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config=self._ADVICE_CFG
+            )
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+                    
+        except Exception as e:
+            logger.error(f"Error getting fitness advice: {e}")
+            yield f"Error getting advice: {str(e)}"
+    
+    def _create_workout_prompt(self, user_profile: Dict[str, Any], 
+                              preferences: Dict[str, Any] = None) -> str:
+        """Create a detailed workout generation prompt."""
+        preferences = preferences or {}
+        
+        return _WORKOUT_PROMPT.format_map(ChainMap(preferences, user_profile, _WORKOUT_DEFAULTS))
+    
+    def create_diet_prompt(self, user_profile: Dict[str, Any], 
+                           available_foods: List[str], 
+                           dietary_goals: Dict[str, Any]) -> str:
+        """Create a detailed diet planning prompt for generate_diet_plan."""
+        
+        foods = {'available_foods': ', '.join(available_foods) if available_foods else 'Standard grocery items'}
+        return _DIET_PROMPT.format_map(ChainMap(foods, dietary_goals, user_profile, _DIET_DEFAULTS))
+    
+    def _create_advice_prompt(self, question: str, user_context: Dict[str, Any] = None) -> str:
+        """Create a prompt for general fitness advice."""
+        context_str = ""
+        if user_context:
+            context_str = _ADVICE_CONTEXT.format_map(ChainMap(user_context, _ADVICE_DEFAULTS))
+        
+        return _ADVICE_PROMPT.format_map({'context': context_str, 'question': question})
+    
+    def _build_workout_plan(self, response_text: str,
+                            preferences: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parse a workout response and attach the request metadata."""
+        workout_plan = self._parse_workout_response(response_text)
+        if workout_plan:
+            logger.info("Workout plan generated successfully")
+            workout_plan['name']=preferences['name']
+            return workout_plan
+        else:
+            logger.error("Failed to parse workout plan response")
+            return None
+
+    def _build_diet_plan(self, response_text: str,
+                         dietary_goals: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parse a diet response and attach the request metadata."""
+        diet_plan = self._parse_diet_response(response_text)
+        if diet_plan:
+            diet_plan['name']=dietary_goals['name']
+            logger.info("Diet plan generated successfully")
+            return diet_plan
+        else:
+            logger.error("Failed to parse diet plan response")
+            return None
+
     def _parse_workout_response(self, response_text: str) -> Optional[Dict[str, Any]]:
         """Parse the workout plan response from Gemini."""
+        try:
             # Try to extract JSON from the response
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}') + 1
-        
-        if start_idx != -1 and end_idx != -1:
-            json_str = response_text[start_idx:end_idx]
-            workout_plan = json.loads(json_str)
+            json_str = _extract_first_json_object(response_text)
             
-            # Validate structure
-            required_fields = ['name', 'description', 'days']
-            if all(field in workout_plan for field in required_fields):
-                return workout_plan
-            
-            # If JSON parsing fails, create a structured plan from text
-            logger.warning("JSON parsing failed, creating fallback workout plan")
-            return self._create_fallback_workout_plan(response_text)
+            if json_str is not None:
+                workout_plan = orjson.loads(json_str)
+                
+                # Validate structure
+                if _is_valid_workout_plan(workout_plan):
+                    return workout_plan
             
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Invalid JSON in workout response: {e}")
+        
+        # If JSON parsing fails, create a structured plan from text
+        logger.warning("JSON parsing failed, creating fallback workout plan")
+        return self._create_fallback_workout_plan(response_text)
     
     def _parse_diet_response(self, response_text: str) -> Optional[Dict[str, Any]]:
         """Parse the diet plan response from Gemini."""
         try:
             # Try to extract JSON from the response
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
+            json_str = _extract_first_json_object(response_text)
             
-            if start_idx != -1 and end_idx != -1:
-                json_str = response_text[start_idx:end_idx]
-                diet_plan = json.loads(json_str)
+            if json_str is not None:
+                diet_plan = orjson.loads(json_str)
                 
                 # Validate structure
-                required_fields = ['name', 'meals']
-                if all(field in diet_plan for field in required_fields):
+                if _is_valid_diet_plan(diet_plan):
                     return diet_plan
             
-            # If JSON parsing fails, create a structured plan from text
-            logger.warning("JSON parsing failed, creating fallback diet plan")
-            return self._create_fallback_diet_plan(response_text)
-            
-        except Exception as e:
-            logger.error(f"Error parsing diet response: {e}")
-            return None
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Invalid JSON in diet response: {e}")
+        
+        # If JSON parsing fails, create a structured plan from text
+        logger.warning("JSON parsing failed, creating fallback diet plan")
+        return self._create_fallback_diet_plan(response_text)
     
     def _create_fallback_workout_plan(self, response_text: str) -> Dict[str, Any]:
         """Create a fallback workout plan when JSON parsing fails."""
+        logger.debug(f"Unparsed workout response preview: {response_text[:200]}")
         return {
             "name": "AI-Generated Workout Plan",
             "description": "Custom workout plan generated by AI",
@@ -391,12 +548,12 @@ Keep your response informative but conversational and supportive.
                         }
                     ]
                 }
-            ],
-            "raw_response": response_text[:1000]  # Store part of original response
+            ]
         }
     
     def _create_fallback_diet_plan(self, response_text: str) -> Dict[str, Any]:
         """Create a fallback diet plan when JSON parsing fails."""
+        logger.debug(f"Unparsed diet response preview: {response_text[:200]}")
         return {
             "name": "AI-Generated Meal Plan",
             "calorie_target": 2000,
@@ -419,10 +576,33 @@ Keep your response informative but conversational and supportive.
                     "servings": 1
                 }
             ],
-            "shopping_list": [],
-            "raw_response": response_text[:1000]  # Store part of original response
+            "shopping_list": []
         }
 
 
-# Create a global Gemini client instance
-gemini_client = GeminiClient()
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _cached_generate(prompt: str, model: str, config_name: str) -> str:
+    """
+    Generate text for a prompt, memoized on the prompt and generation settings.
+
+    Identical requests (e.g. a regenerated plan or a repeated question) are
+    served from the cache instead of making another Gemini round-trip.
+    Failed calls raise and are therefore never cached.
+
+    Args:
+        prompt: Prompt text
+        model: Gemini model name
+        config_name: Name of a prebuilt GeminiClient generation config
+    """
+    response = get_gemini_client().client.models.generate_content(
+        model=model,
+        contents=prompt,
+        config=getattr(GeminiClient, config_name)
+    )
+    return response.text
+
+
+@st.cache_resource
+def get_gemini_client() -> GeminiClient:
+    """Return the process-wide Gemini client, shared across reruns and sessions."""
+    return GeminiClient()
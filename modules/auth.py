@@ -1,24 +1,46 @@
 import streamlit as st
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import logging
+import time
 from modules.database import db
 
 logger = logging.getLogger(__name__)
 
+# Session state keys and their initial values
+_SESSION_DEFAULTS = (
+    ('authenticated', False),
+    ('user_data', None),
+    ('session_token', None),
+    ('current_page', 'profile'),
+    ('display_name', None),
+)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_user(session_token: str) -> Optional[Tuple[Dict[str, Any], int]]:
+    """
+    Load the user behind a session token and the session's expiry (unix seconds),
+    cached so reruns skip the database.
+    """
+    user_data = db.validate_session(session_token)
+    if user_data:
+        return user_data, user_data.pop('session_expires_at')
+    return None
+
+def _display_name(user_data: Dict[str, Any]) -> str:
+    """Name shown in the sidebar greeting."""
+    return user_data.get('first_name') or user_data.get('username')
+
 class AuthManager:
     """Manages user authentication and session state."""
 
     @staticmethod
     def initialize_session_state():
-        """Initialize session state variables."""
-        if 'authenticated' not in st.session_state:
-            st.session_state.authenticated = False
-        if 'user_data' not in st.session_state:
-            st.session_state.user_data = None
-        if 'session_token' not in st.session_state:
-            st.session_state.session_token = None
-        if 'current_page' not in st.session_state:
-            st.session_state.current_page = 'profile'
+        """Initialize session state variables (once per browser session)."""
+        if st.session_state.get('_init_done'):
+            return
+        for key, value in _SESSION_DEFAULTS:
+            st.session_state.setdefault(key, value)
+        st.session_state._init_done = True
 
     @staticmethod
     def is_authenticated() -> bool:
@@ -28,6 +50,14 @@ class AuthManager:
     @staticmethod
     def get_current_user() -> Optional[Dict[str, Any]]:
         """Get current authenticated user data."""
+        session_token = st.session_state.get('session_token')
+        if session_token:
+            cached = _fetch_user(session_token)
+            if cached and cached[1] > time.time():
+                return cached[0]
+            # Expired or unknown token: the user has to log in again
+            AuthManager._clear_login()
+            return None
         return st.session_state.get('user_data')
 
     @staticmethod
@@ -42,16 +72,33 @@ class AuthManager:
         st.session_state.authenticated = True
         st.session_state.user_data = user_data
         st.session_state.session_token = session_token
+        st.session_state.display_name = _display_name(user_data)
         logger.info(f"User logged in: {user_data.get('username')}")
 
+    @staticmethod
+    def update_user_data(user_data: Dict[str, Any]):
+        """Replace the current user's data after a profile change."""
+        st.session_state.user_data = user_data
+        st.session_state.display_name = _display_name(user_data)
+        if st.session_state.get('session_token'):
+            _fetch_user.clear(st.session_state.session_token)
+
     @staticmethod
     def logout_user():
         """Logout user and clear session state."""
+        AuthManager._clear_login()
+        st.session_state.current_page = 'profile'
+        logger.info("User logged out")
+
+    @staticmethod
+    def _clear_login():
+        """Forget the logged-in user and drop their session token from the user cache."""
+        if st.session_state.get('session_token'):
+            _fetch_user.clear(st.session_state.session_token)
         st.session_state.authenticated = False
         st.session_state.user_data = None
         st.session_state.session_token = None
-        st.session_state.current_page = 'profile'
-        logger.info("User logged out")
+        st.session_state.display_name = None
 
     @staticmethod
     def render_auth_form():
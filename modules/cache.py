@@ -0,0 +1,38 @@
+"""
+Cached per-user reads for the Fitness Dashboard pages.
+Pages call these instead of the database directly and clear the
+matching cache after a successful write.
+"""
+import streamlit as st
+from typing import Any, Dict, List
+from modules.database import db
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_user_foods(user_id: int) -> List[str]:
+    """Food inventory for a user."""
+    return db.get_user_foods(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_diet_plans(user_id: int) -> List[Dict]:
+    """Saved diet plans for a user, newest first."""
+    return db.get_user_diet_plans(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_workout_plans(user_id: int) -> List[Dict]:
+    """Saved workout plans for a user, newest first."""
+    return db.get_user_workout_plans(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_day_exercises(workout_day_id: int) -> List[Dict]:
+    """Exercises prescribed for a workout day."""
+    return db.get_day_exercises(workout_day_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_body_metrics(user_id: int) -> List[Dict]:
+    """Body measurements for a user, oldest first."""
+    return db.get_body_metrics(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_dashboard(user_id: int) -> Dict[str, Any]:
+    """Progress overview data: plans, body metrics, last month's workouts and last week's nutrition."""
+    return db.fetch_dashboard(user_id, workout_range="1 Month", nutrition_range="1 Week")
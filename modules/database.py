@@ -5,18 +5,93 @@ Handles SQLite database operations, connection management, and data persistence.
 
 import sqlite3
 import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import base64
 import hashlib
+import hmac
 import secrets
-from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any, Tuple
+from datetime import date, timedelta
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Optional, Dict, List, Any, Tuple, Mapping, Iterator
 import logging
+import numpy as np
 import pandas as pd
 import json
+from modules._sql import (
+    SQL_FIND_USER_ID, SQL_INSERT_USER, SQL_SELECT_LOGIN, SQL_SELECT_USER,
+    SQL_UPDATE_USER_PROFILE, SQL_SELECT_USER_COUNTS, SQL_INSERT_SESSION, SQL_SELECT_SESSION_USER,
+    SQL_INSERT_WORKOUT_PLAN, SQL_INSERT_WORKOUT_DAY, SQL_SELECT_WORKOUT_DAY_IDS,
+    SQL_INSERT_EXERCISE, SQL_SELECT_EXERCISE_IDS, SQL_INSERT_WORKOUT_EXERCISE,
+    SQL_SELECT_WORKOUT_PLANS, SQL_SELECT_DAY_EXERCISES, SQL_INSERT_DIET_PLAN, SQL_INSERT_MEAL_PLAN,
+    SQL_INSERT_SHOPPING_ITEM, SQL_SELECT_DIET_PLANS, SQL_SELECT_FOODS, SQL_INSERT_FOOD,
+    SQL_INSERT_MEAL_LOG, SQL_SELECT_NUTRITION_LOGS, SQL_SELECT_NUTRITION_FOR_DATE,
+    SQL_SELECT_WORKOUT_HISTORY, SQL_SELECT_BODY_METRICS, SQL_INSERT_PROGRESS
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Idle connections kept open for reuse; connections beyond this are closed on release
+_POOL_SIZE = 8
+
+# PBKDF2-HMAC-SHA256 work factor for new password hashes
+_PBKDF2_ITERATIONS = 200_000
+
+# User profile columns that update_user_profile may change
+_PROFILE_FIELDS = ('first_name', 'last_name', 'age', 'gender', 'height_cm',
+                   'weight_kg', 'activity_level', 'fitness_goals', 'injuries',
+                   'experience_level')
+
+# Recorded in PRAGMA user_version once the one-off data migrations below have run
+_SCHEMA_VERSION = 1
+
+# Columns added to existing tables since the original schema
+# (table, column, definition, statement that backfills existing rows)
+_ADDED_COLUMNS = (
+    ('meal_logs', 'logged_on', "DATE GENERATED ALWAYS AS (DATE(logged_at)) VIRTUAL", None),
+    ('workout_logs', 'completed_on', "DATE GENERATED ALWAYS AS (DATE(completed_at)) VIRTUAL", None),
+    ('exercise_logs', 'reps_int', "INTEGER",
+     "UPDATE exercise_logs SET reps_int = CAST(reps_completed AS INTEGER)"),
+)
+
+# Date range labels used by the history views -> number of days
+_DAYS_MAP: Mapping[str, int] = MappingProxyType({
+    "1 Week": 7,
+    "2 Weeks": 14,
+    "1 Month": 30,
+    "3 Months": 90,
+    "6 Months": 180,
+    "1 Year": 365
+})
+
+@lru_cache(maxsize=16)
+def _start_date(date_range: str, today: date) -> str:
+    """First day (YYYY-MM-DD) of a history date range ending today."""
+    return (today - timedelta(days=_DAYS_MAP.get(date_range, 30))).strftime('%Y-%m-%d')
+
+def _fetch_frame(cursor: sqlite3.Cursor, text_columns: Tuple[str, ...] = ('date',)) -> pd.DataFrame:
+    """
+    Build a DataFrame column by column from an executed cursor.
+    Text columns are kept as objects; every other column is converted with
+    pd.to_numeric, so NULLs and non-numeric values (e.g. "2000-2200") become
+    NaN instead of failing the whole frame.
+    """
+    columns = [description[0] for description in cursor.description]
+    rows = cursor.fetchall()
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame({
+        name: np.array(values, dtype=object) if name in text_columns
+              else pd.to_numeric(np.array(values, dtype=object), errors='coerce')
+        for name, values in zip(columns, zip(*rows))
+    })
+
 class DatabaseManager:
     """Manages database connections and operations for the fitness dashboard."""
 
@@ -27,18 +102,24 @@ class DatabaseManager:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=_POOL_SIZE)
+        self._update_sql_cache: Dict[Tuple[str, ...], str] = {}
+        self._read_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="db-read")
         self.ensure_database_exists()
 
     def ensure_database_exists(self) -> None:
         """Create the database and tables if they don't exist."""
         try:
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            if not os.path.exists(self.db_path):
+                self._create_database_file()
             with self.get_connection() as conn:
                 # Read and execute schema
                 schema_path = "database/schema.sql"
                 if os.path.exists(schema_path):
                     with open(schema_path, 'r') as f:
                         schema = f.read()
+                    self._migrate_schema(conn)
                     conn.executescript(schema)
                     logger.info("Database schema created successfully")
                 else:
@@ -48,6 +129,39 @@ class DatabaseManager:
             logger.error(f"Error creating database: {e}")
             raise
 
+    def _create_database_file(self) -> None:
+        """Create an empty database file with settings that only apply at creation."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # Page size is fixed once the first page is written; WAL mode then persists
+            conn.execute("PRAGMA page_size=8192")
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+    def _migrate_schema(self, conn):
+        """Bring a database created by an older schema up to date."""
+        for table, column, definition, backfill in _ADDED_COLUMNS:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+            if columns and column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                if backfill:
+                    conn.execute(backfill)
+                logger.info(f"Added column {table}.{column}")
+
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+            return
+
+        # Session expiry used to be stored as local-time text; it is now unix seconds.
+        # Unparsable values become 0, i.e. an already expired session.
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'user_sessions'").fetchone():
+            conn.execute("""
+                UPDATE user_sessions
+                SET expires_at = COALESCE(CAST(strftime('%s', expires_at, 'utc') AS INTEGER), 0)
+                WHERE typeof(expires_at) = 'text'
+            """)
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
     def _create_default_schema(self, conn):
         """Create default schema if schema.sql is not found."""
         default_schema = """
@@ -71,31 +185,60 @@ class DatabaseManager:
         """
         conn.executescript(default_schema)
 
-    def get_connection(self) -> sqlite3.Connection:
+    @contextmanager
+    def get_connection(self) -> Iterator[sqlite3.Connection]:
         """
-        Get a database connection with row factory enabled.
-        Returns:
-            SQLite connection object
+        Borrow a pooled database connection for one transaction.
+        Use as `with db.get_connection() as conn:`; the block commits on
+        success and rolls back on error, then the connection goes back to
+        the pool, or is closed if the pool already holds _POOL_SIZE idle ones.
+        Yields:
+            SQLite connection object with row factory enabled
         """
-        conn = sqlite3.connect(self.db_path)
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._open_connection()
+        try:
+            with conn:
+                yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a connection for the pool; it may be used by any thread, one at a time."""
+        conn = sqlite3.connect(self.db_path, cached_statements=256, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA mmap_size=268435456")
         return conn
 
     def hash_password(self, password: str) -> str:
         """
-        Hash a password using SHA-256 with salt.
+        Hash a password using PBKDF2-HMAC-SHA256 with a random salt.
         Args:
             password: Plain text password
         Returns:
-            Hashed password string
+            Hashed password string in the form "iterations:salt:hash",
+            with salt and hash base64-encoded
         """
-        salt = secrets.token_hex(16)
-        password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-        return f"{salt}:{password_hash}"
+        salt = secrets.token_bytes(16)
+        dk = hashlib.pbkdf2_hmac('sha256', password.encode(), salt,
+                                 _PBKDF2_ITERATIONS, dklen=32)
+        return (f"{_PBKDF2_ITERATIONS}:{base64.b64encode(salt).decode()}:"
+                f"{base64.b64encode(dk).decode()}")
 
     def verify_password(self, password: str, stored_hash: str) -> bool:
         """
         Verify a password against a stored hash.
+        Accepts PBKDF2 hashes ("iterations:salt:hash") as well as legacy
+        single-round SHA-256 hashes ("salt:hash").
         Args:
             password: Plain text password to verify
             stored_hash: Stored password hash
@@ -103,8 +246,15 @@ class DatabaseManager:
             True if password matches, False otherwise
         """
         try:
-            salt, password_hash = stored_hash.split(':')
-            return hashlib.sha256((password + salt).encode()).hexdigest() == password_hash
+            parts = stored_hash.split(':')
+            if len(parts) == 3:
+                iterations, salt, password_hash = parts
+                dk = hashlib.pbkdf2_hmac('sha256', password.encode(), base64.b64decode(salt),
+                                         int(iterations), dklen=32)
+                return hmac.compare_digest(dk, base64.b64decode(password_hash))
+            salt, password_hash = parts
+            computed_hash = hashlib.sha256((password + salt).encode()).hexdigest()
+            return hmac.compare_digest(computed_hash.encode(), password_hash.encode())
         except ValueError:
             return False
 
@@ -125,10 +275,7 @@ class DatabaseManager:
                 cursor = conn.cursor()
                 
                 # Check if user already exists
-                cursor.execute(
-                    "SELECT id FROM users WHERE username = ? OR email = ?",
-                    (username, email)
-                )
+                cursor.execute(SQL_FIND_USER_ID, (username, email))
                 
                 if cursor.fetchone():
                     logger.warning(f"User already exists: {username} or {email}")
@@ -138,12 +285,7 @@ class DatabaseManager:
                 password_hash = self.hash_password(password)
                 user_data = user_data or {}
                 
-                cursor.execute("""
-                    INSERT INTO users (username, email, password_hash, first_name,
-                                     last_name, age, gender, height_cm, weight_kg,
-                                     activity_level, fitness_goals, injuries, experience_level)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+                cursor.execute(SQL_INSERT_USER, (
                     username, email, password_hash,
                     user_data.get('first_name'),
                     user_data.get('last_name'),
@@ -177,15 +319,14 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT * FROM users WHERE username = ? OR email = ?",
-                    (username, username)
-                )
+                cursor.execute(SQL_SELECT_LOGIN, (username, username, username))
 
-                user = cursor.fetchone()
-                if user and self.verify_password(password, user['password_hash']):
+                login = cursor.fetchone()
+                if login and self.verify_password(password, login['password_hash']):
+                    # Only load the profile once the password has been checked
+                    cursor.execute(SQL_SELECT_USER, (login['id'],))
                     logger.info(f"User authenticated: {username}")
-                    return dict(user)
+                    return dict(cursor.fetchone())
                 else:
                     logger.warning(f"Authentication failed: {username}")
                     return None
@@ -207,12 +348,9 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 session_token = secrets.token_urlsafe(32)
-                expires_at = datetime.now() + timedelta(hours=duration_hours)
+                expires_at = int(time.time()) + duration_hours * 3600
 
-                cursor.execute("""
-                    INSERT INTO user_sessions (user_id, session_token, expires_at)
-                    VALUES (?, ?, ?)
-                """, (user_id, session_token, expires_at))
+                cursor.execute(SQL_INSERT_SESSION, (user_id, session_token, expires_at))
 
                 logger.info(f"Session created for user {user_id}")
                 return session_token
@@ -232,11 +370,7 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT u.* FROM users u
-                    JOIN user_sessions s ON u.id = s.user_id
-                    WHERE s.session_token = ? AND s.expires_at > ?
-                """, (session_token, datetime.now()))
+                cursor.execute(SQL_SELECT_SESSION_USER, (session_token, int(time.time())))
 
                 user = cursor.fetchone()
                 if user:
@@ -259,70 +393,56 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                
+
+                # Take the write lock up front so the whole plan commits at once
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+
                 # Insert workout plan
-                cursor.execute("""
-                    INSERT INTO workout_plans (user_id, name, description, duration_weeks,
-                                             ai_generated, gemini_prompt)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
+                cursor.execute(SQL_INSERT_WORKOUT_PLAN, (
                     user_id,
                     plan_data.get('name'),
                     plan_data.get('description'),
                     plan_data.get('duration_weeks'),
-                    plan_data.get('ai_generated', True),
-                    plan_data.get('gemini_prompt')
+                    plan_data.get('ai_generated', True)
                 ))
 
                 workout_plan_id = cursor.lastrowid
 
-                # Insert workout days and exercises
-                for day_data in plan_data.get('days', []):
-                    cursor.execute("""
-                        INSERT INTO workout_days (workout_plan_id, day_number, day_name, focus_area)
-                        VALUES (?, ?, ?, ?)
-                    """, (
-                        workout_plan_id,
-                        day_data.get('day_number'),
-                        day_data.get('day_name'),
-                        day_data.get('focus_area')
-                    ))
-
-                    day_id = cursor.lastrowid
-
+                # Insert workout days, then read their ids back in insertion order
+                days = plan_data.get('days', [])
+                cursor.executemany(SQL_INSERT_WORKOUT_DAY, [
+                    (workout_plan_id, day_data.get('day_number'),
+                     day_data.get('day_name'), day_data.get('focus_area'))
+                    for day_data in days
+                ])
+                cursor.execute(SQL_SELECT_WORKOUT_DAY_IDS, (workout_plan_id,))
+                day_ids = list(map(itemgetter(0), cursor))
+
+                # Insert exercises that are not in the library yet, then map names to ids
+                exercises = {}
+                for day_data in days:
                     for exercise_data in day_data.get('exercises', []):
-                        # Insert or get exercise
-                        cursor.execute("""
-                            INSERT OR IGNORE INTO exercises (name, category, muscle_groups,
-                                                           equipment, difficulty_level, instructions)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                        """, (
-                            exercise_data.get('name'),
-                            exercise_data.get('category'),
-                            exercise_data.get('muscle_groups'),
-                            exercise_data.get('equipment'),
-                            exercise_data.get('difficulty_level'),
-                            exercise_data.get('instructions')
-                        ))
-
-                        cursor.execute("SELECT id FROM exercises WHERE name = ?",
-                                     (exercise_data.get('name'),))
-                        exercise_id = cursor.fetchone()['id']
-
-                        # Link exercise to workout day
-                        cursor.execute("""
-                            INSERT INTO workout_exercises (workout_day_id, exercise_id, sets,
-                                                         reps, weight_kg, rest_seconds, notes)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            day_id,
-                            exercise_id,
-                            exercise_data.get('sets'),
-                            exercise_data.get('reps'),
-                            exercise_data.get('weight_kg'),
-                            exercise_data.get('rest_seconds'),
-                            exercise_data.get('notes')
-                        ))
+                        exercises.setdefault(exercise_data.get('name'), exercise_data)
+                exercise_ids = self._get_exercise_ids(cursor, list(exercises))
+                cursor.executemany(SQL_INSERT_EXERCISE, [
+                    (name, exercise_data.get('category'), exercise_data.get('muscle_groups'),
+                     exercise_data.get('equipment'), exercise_data.get('difficulty_level'),
+                     exercise_data.get('instructions'))
+                    for name, exercise_data in exercises.items() if name not in exercise_ids
+                ])
+                if len(exercise_ids) < len(exercises):
+                    exercise_ids = self._get_exercise_ids(cursor, list(exercises))
+
+                # Link exercises to workout days
+                cursor.executemany(SQL_INSERT_WORKOUT_EXERCISE, [
+                    (day_id, exercise_ids[exercise_data.get('name')],
+                     exercise_data.get('sets'), exercise_data.get('reps'),
+                     exercise_data.get('weight_kg'), exercise_data.get('rest_seconds'),
+                     exercise_data.get('notes'))
+                    for day_id, day_data in zip(day_ids, days)
+                    for exercise_data in day_data.get('exercises', [])
+                ])
 
                 logger.info(f"Workout plan saved: {plan_data.get('name')} (ID: {workout_plan_id})")
                 return workout_plan_id
@@ -331,6 +451,14 @@ class DatabaseManager:
             logger.error(f"Error saving workout plan: {e}")
             return None
 
+    def _get_exercise_ids(self, cursor: sqlite3.Cursor, names: List[str]) -> Dict[str, int]:
+        """Map exercise names to the id of the first library row with that name."""
+        if not names:
+            return {}
+        placeholders = ", ".join("?" * len(names))
+        cursor.execute(SQL_SELECT_EXERCISE_IDS.format(placeholders=placeholders), names)
+        return dict(cursor.fetchall())
+
     def save_diet_plan(self, user_id: int, diet_data: Dict[str, Any]) -> Optional[int]:
         """
         Save a diet plan to the database.
@@ -344,13 +472,12 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
 
+                # Take the write lock up front so the whole plan commits at once
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+
                 # Insert diet plan
-                cursor.execute("""
-                    INSERT INTO diet_plans (user_id, name, calorie_target, protein_target_g,
-                                          carb_target_g, fat_target_g, dietary_restrictions,
-                                          ai_generated, gemini_prompt)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+                cursor.execute(SQL_INSERT_DIET_PLAN, (
                     user_id,
                     diet_data.get('name'),
                     diet_data.get('calorie_target'),
@@ -358,21 +485,14 @@ class DatabaseManager:
                     diet_data.get('carb_target_g'),
                     diet_data.get('fat_target_g'),
                     diet_data.get('dietary_restrictions'),
-                    diet_data.get('ai_generated', True),
-                    diet_data.get('gemini_prompt')
+                    diet_data.get('ai_generated', True)
                 ))
 
                 diet_plan_id = cursor.lastrowid
 
                 # Insert meal plans
-                for meal_data in diet_data.get('meals', []):
-                    cursor.execute("""
-                        INSERT INTO meal_plans (diet_plan_id, day_number, meal_type,
-                                              recipe_name, ingredients, instructions,
-                                              calories_per_serving, protein_g, carbs_g,
-                                              fat_g, servings)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
+                cursor.executemany(SQL_INSERT_MEAL_PLAN, [
+                    (
                         diet_plan_id,
                         meal_data.get('day_number'),
                         meal_data.get('meal_type'),
@@ -384,22 +504,22 @@ class DatabaseManager:
                         meal_data.get('carbs_g'),
                         meal_data.get('fat_g'),
                         meal_data.get('servings', 1)
-                    ))
+                    )
+                    for meal_data in diet_data.get('meals', [])
+                ])
 
                 # Insert shopping list items
-                for item_data in diet_data.get('shopping_list', []):
-                    cursor.execute("""
-                        INSERT INTO shopping_lists (user_id, diet_plan_id, item_name,
-                                                   quantity, unit, category)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
+                cursor.executemany(SQL_INSERT_SHOPPING_ITEM, [
+                    (
                         user_id,
                         diet_plan_id,
                         item_data.get('item_name'),
                         item_data.get('quantity'),
                         item_data.get('unit'),
                         item_data.get('category')
-                    ))
+                    )
+                    for item_data in diet_data.get('shopping_list', [])
+                ])
 
                 logger.info(f"Diet plan saved: {diet_data.get('name')} (ID: {diet_plan_id})")
                 return diet_plan_id
@@ -413,26 +533,29 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT * FROM workout_plans
-                    WHERE user_id = ?
-                    ORDER BY created_at DESC
-                """, (user_id,))
+                cursor.execute(SQL_SELECT_WORKOUT_PLANS, (user_id,))
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
             logger.error(f"Error getting workout plans: {e}")
             return []
 
+    def get_day_exercises(self, workout_day_id: int) -> List[Dict[str, Any]]:
+        """Get the exercises prescribed for a workout day, with their plan notes as exercise_notes."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(SQL_SELECT_DAY_EXERCISES, (workout_day_id,))
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error getting exercises for workout day {workout_day_id}: {e}")
+            return []
+
     def get_user_diet_plans(self, user_id: int) -> List[Dict[str, Any]]:
         """Get all diet plans for a user."""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT * FROM diet_plans
-                    WHERE user_id = ?
-                    ORDER BY created_at DESC
-                """, (user_id,))
+                cursor.execute(SQL_SELECT_DIET_PLANS, (user_id,))
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
             logger.error(f"Error getting diet plans: {e}")
@@ -443,24 +566,29 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT food_name FROM food_inventory WHERE user_id = ?
-                """, (user_id,))
-                foods = [row[0] for row in cursor.fetchall()]
-                return foods
+                cursor.execute(SQL_SELECT_FOODS, (user_id,))
+                return list(map(itemgetter(0), cursor))
         except Exception as e:
             logger.error(f"Error retrieving user foods: {e}")
             return []
 
     def add_food_to_inventory(self, user_id: int, food_name: str) -> bool:
         """Add a food item to user's inventory."""
+        return self.add_foods_to_inventory(user_id, [food_name])
+
+    def add_foods_to_inventory(self, user_id: int, food_names: List[str]) -> bool:
+        """
+        Add several food items to user's inventory in one transaction.
+        Args:
+            user_id: User ID
+            food_names: Food names to add
+        Returns:
+            True if successful, False otherwise
+        """
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT OR IGNORE INTO food_inventory (user_id, food_name)
-                    VALUES (?, ?)
-                """, (user_id, food_name))
+                cursor.executemany(SQL_INSERT_FOOD, [(user_id, name) for name in food_names])
                 return True
         except Exception as e:
             logger.error(f"Error adding food to inventory: {e}")
@@ -469,14 +597,28 @@ class DatabaseManager:
     def log_meal_consumption(self, user_id: int, meal_type: str, description: str, 
                            calories: float, protein: float, carbs: float, fat: float) -> bool:
         """Log a meal as eaten by the user with nutritional details."""
+        return self.log_meal_consumptions(user_id, [{
+            'meal_type': meal_type, 'description': description, 'calories': calories,
+            'protein': protein, 'carbs': carbs, 'fat': fat
+        }])
+
+    def log_meal_consumptions(self, user_id: int, meals: List[Dict[str, Any]]) -> bool:
+        """
+        Log several eaten meals in one transaction.
+        Args:
+            user_id: User ID
+            meals: Dicts with meal_type, description, calories, protein, carbs and fat
+        Returns:
+            True if successful, False otherwise
+        """
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO meal_logs
-                    (user_id, meal_type, food_items, calories_consumed, protein_g, carbs_g, fat_g)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (user_id, meal_type, description, calories, protein, carbs, fat))
+                cursor.executemany(SQL_INSERT_MEAL_LOG, [
+                    (user_id, meal['meal_type'], meal['description'], meal['calories'],
+                     meal['protein'], meal['carbs'], meal['fat'])
+                    for meal in meals
+                ])
                 return True
         except Exception as e:
             logger.error(f"Error logging meal consumption: {e}")
@@ -484,87 +626,50 @@ class DatabaseManager:
 
     def get_nutrition_logs(self, user_id: int, date_range: str) -> pd.DataFrame:
         """Retrieve daily nutrition logs for a user."""
-        days_map = {
-            "1 Week": 7,
-            "2 Weeks": 14,
-            "1 Month": 30,
-            "3 Months": 90,
-            "6 Months": 180,
-            "1 Year": 365
-        }
-        days = days_map.get(date_range, 30)
-        
         try:
             with self.get_connection() as conn:
-                start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+                start_date = _start_date(date_range, date.today())
 
-                # Get most recent calorie target
+                # Get daily nutrition logs along with the most recent calorie target
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT calorie_target
-                    FROM diet_plans
-                    WHERE user_id = ?
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                """, (user_id,))
-                target_row = cursor.fetchone()
-                target_calories = target_row[0] if target_row else None
-
-                # Get daily nutrition logs
-                query = """
-                    SELECT
-                        DATE(ml.logged_at) AS date,
-                        SUM(ml.calories_consumed) AS calories,
-                        SUM(ml.protein_g) AS protein,
-                        SUM(ml.carbs_g) AS carbs,
-                        SUM(ml.fat_g) AS fats
-                    FROM meal_logs ml
-                    WHERE ml.user_id = ? AND DATE(ml.logged_at) >= ?
-                    GROUP BY DATE(ml.logged_at)
-                    ORDER BY DATE(ml.logged_at) ASC
-                """
-                
-                df = pd.read_sql_query(query, conn, params=(user_id, start_date))
-                if not df.empty and target_calories is not None:
-                    df['target_calories'] = target_calories
+                cursor.execute(SQL_SELECT_NUTRITION_LOGS, (user_id, user_id, start_date))
+                df = _fetch_frame(cursor)
+                if df.empty or df['target_calories'].isna().all():
+                    df = df.drop(columns='target_calories')
                 return df
 
         except Exception as e:
             logger.error(f"Error retrieving nutrition logs: {e}")
             return pd.DataFrame()
 
+    def get_nutrition_for_date(self, user_id: int, day: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve nutrition totals for a single day.
+        Args:
+            user_id: User ID
+            day: Date string (YYYY-MM-DD)
+        Returns:
+            Dict with calories, protein, carbs, fats and target_calories,
+            or None if nothing was logged that day
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(SQL_SELECT_NUTRITION_FOR_DATE, (user_id, user_id, day))
+                row = cursor.fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            logger.error(f"Error retrieving nutrition for {day}: {e}")
+            return None
+
     def get_workout_history(self, user_id: int, date_range: str) -> pd.DataFrame:
         """Retrieve workout history for a user filtered by date range."""
-        days_map = {
-            "1 Week": 7,
-            "2 Weeks": 14,
-            "1 Month": 30,
-            "3 Months": 90,
-            "6 Months": 180,
-            "1 Year": 365
-        }
-        days = days_map.get(date_range, 30)
-
         try:
             with self.get_connection() as conn:
-                start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-                query = """
-                    SELECT
-                        wl.completed_at AS date,
-                        wl.plan_name AS name,
-                        wd.day_number AS day_number,
-                        SUM(el.sets_completed * CAST(el.reps_completed AS INTEGER) * el.weight_used_kg) AS volume,
-                        COUNT(DISTINCT wl.id) AS sessions,
-                        AVG(wl.duration_minutes) AS duration,
-                        1.0 AS completion_rate
-                    FROM workout_logs wl
-                    JOIN exercise_logs el ON wl.id = el.workout_log_id
-                    JOIN workout_days wd ON wl.workout_day_id = wd.id
-                    WHERE wl.user_id = ? AND DATE(wl.completed_at) >= ?
-                    GROUP BY DATE(wl.completed_at), wl.plan_name, wd.day_number
-                    ORDER BY DATE(wl.completed_at) ASC
-                """
-                return pd.read_sql_query(query, conn, params=(user_id, start_date))
+                start_date = _start_date(date_range, date.today())
+                cursor = conn.cursor()
+                cursor.execute(SQL_SELECT_WORKOUT_HISTORY, (user_id, start_date))
+                return _fetch_frame(cursor, text_columns=('date', 'name'))
         except Exception as e:
             logger.error(f"Error retrieving workout history: {e}")
             return pd.DataFrame()
@@ -574,28 +679,39 @@ class DatabaseManager:
         """Retrieve body composition metrics for a user ordered by date."""
         try:
             with self.get_connection() as conn:
-                conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT height_cm, weight_kg, date
-                    FROM progress_tracking
-                    WHERE user_id = ?
-                    ORDER BY date ASC
-                """, (user_id,))
+                cursor.execute(SQL_SELECT_BODY_METRICS, (user_id,))
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
             logger.error(f"Error retrieving body metrics: {e}")
             return []
 
+    def fetch_dashboard(self, user_id: int, workout_range: str = "1 Month",
+                        nutrition_range: str = "1 Week") -> Dict[str, Any]:
+        """
+        Run the independent reads behind the progress dashboard concurrently.
+        Each pool thread uses its own connection; WAL lets the reads overlap.
+        Args:
+            user_id: User ID
+            workout_range: Date range label for the workout history
+            nutrition_range: Date range label for the nutrition logs
+        Returns:
+            Dict with workout_plans, body_metrics, workout_history and nutrition_logs
+        """
+        futures = {
+            'workout_plans': self._read_pool.submit(self.get_user_workout_plans, user_id),
+            'body_metrics': self._read_pool.submit(self.get_body_metrics, user_id),
+            'workout_history': self._read_pool.submit(self.get_workout_history, user_id, workout_range),
+            'nutrition_logs': self._read_pool.submit(self.get_nutrition_logs, user_id, nutrition_range),
+        }
+        return {key: future.result() for key, future in futures.items()}
+
     def add_progress_entry(self, user_id: int, weight_kg: float, height_cm: float,date) -> bool:
         """Add a progress tracking entry."""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO progress_tracking (user_id, weight_kg, height_cm,date)
-                    VALUES (?, ?, ?,?)
-                """, (user_id, weight_kg, height_cm,date))
+                cursor.execute(SQL_INSERT_PROGRESS, (user_id, weight_kg, height_cm, date))
                 return True
         except Exception as e:
             logger.error(f"Error adding progress entry: {e}")
@@ -607,21 +723,15 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Build dynamic update query
-                update_fields = []
-                values = []
-                
-                for field in ['first_name', 'last_name', 'age', 'gender', 'height_cm', 
-                             'weight_kg', 'activity_level', 'fitness_goals', 'injuries', 
-                             'experience_level']:
-                    if field in profile_data:
-                        update_fields.append(f"{field} = ?")
-                        values.append(profile_data[field])
-                
-                if update_fields:
-                    values.append(user_id)
-                    query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = ?"
-                    cursor.execute(query, values)
+                # Look up (or build once) the UPDATE statement for this set of fields
+                fields = tuple(field for field in _PROFILE_FIELDS if field in profile_data)
+                if fields:
+                    query = self._update_sql_cache.get(fields)
+                    if query is None:
+                        assignments = ", ".join(f"{field} = ?" for field in fields)
+                        query = SQL_UPDATE_USER_PROFILE.format(assignments=assignments)
+                        self._update_sql_cache[fields] = query
+                    cursor.execute(query, (*(profile_data[field] for field in fields), user_id))
                     return True
                 return False
                 
@@ -629,5 +739,22 @@ class DatabaseManager:
             logger.error(f"Error updating user profile: {e}")
             return False
 
+    def get_user_counts(self, user_id: int) -> Tuple[int, int, int]:
+        """
+        Count a user's saved records in one query.
+        Args:
+            user_id: User ID
+        Returns:
+            Tuple of (workout plans, diet plans, food items)
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(SQL_SELECT_USER_COUNTS, (user_id, user_id, user_id))
+                return tuple(cursor.fetchone())
+        except Exception as e:
+            logger.error(f"Error counting user records: {e}")
+            return 0, 0, 0
+
 # Create a global database instance
 db = DatabaseManager()
@@ -3,28 +3,21 @@ Diet and nutrition page for the Fitness Dashboard.
 Handles meal planning, nutrition tracking, and food inventory management.
 """
 import streamlit as st
-import requests
-from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from modules.database import db
+from modules.cache import cached_user_foods, cached_diet_plans, cached_dashboard
 from modules.auth import AuthManager
-from dotenv import load_dotenv
-from modules.ai_integration import gemini_client
-from typing import List
+from modules.ai_integration import GeminiClient, get_gemini_client
+from typing import Dict, Optional, Tuple
 import logging
-import pandas as pd
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-load_dotenv()
-
 def render_diet_content():
     """Render the diet and nutrition page content."""
-    st.markdown('<div class="main-header">', unsafe_allow_html=True)
-    st.title("🥗 Diet & Nutrition")
-    st.markdown("AI-powered meal planning and nutrition tracking")
-    st.markdown('</div>', unsafe_allow_html=True)
+    st.html('<div class="main-header"><h1>🥗 Diet &amp; Nutrition</h1><p>AI-powered meal planning and nutrition tracking</p></div>')
 
     user_id = AuthManager.get_current_user_id()
     if not user_id:
@@ -53,7 +46,7 @@ def render_diet_generator():
     st.subheader("🤖 AI Meal Plan Generator")
     user = AuthManager.get_current_user()
     
-    if not gemini_client.is_available():
+    if not get_gemini_client().is_available():
         st.warning("AI integration is not available. Please configure GEMINI_API_KEY in your environment.")
         return
     
@@ -89,69 +82,110 @@ def render_diet_generator():
             placeholder="e.g., Mediterranean, Asian, American..."
         )
         
-        if st.form_submit_button("Generate Meal Plan", type="primary"):
-            with st.spinner("Creating your personalized meal plan..."):
-                try:
-                    # Get user's food inventory
-                    available_foods = db.get_user_foods(user['id'])
-                    if not available_foods:
-                        st.info("No foods in your inventory. Using standard ingredients.")
-                        available_foods = ["chicken breast", "rice", "broccoli", "eggs", "oats", 
-                                         "salmon", "sweet potato", "spinach", "almonds", "Greek yogurt"]
-                    
-                    # Prepare user profile and dietary goals
-                    user_profile = {
-                        'age': user.get('age'),
-                        'gender': user.get('gender'),
-                        'height_cm': user.get('height_cm'),
-                        'weight_kg': user.get('weight_kg'),
-                        'activity_level': user.get('activity_level'),
-                        'fitness_goals': user.get('fitness_goals')
-                    }
-                    
-                    dietary_goals = {
-                        'name':name,
-                        'calorie_target': calorie_target,
-                        'protein_target': protein_target,
-                        'carb_target': carb_target,
-                        'fat_target': fat_target,
-                        'restrictions': dietary_restrictions,
-                        'meals_per_day': meals_per_day,
-                        'snacks_per_day': snacks_per_day,
-                        'cooking_time': cooking_time,
-                        'cuisine_preference': cuisine_preference
-                    }
-                    
-                    # Generate diet plan
-                    diet_plan = gemini_client.generate_diet_plan(user_profile, available_foods, dietary_goals)
+        generating = st.session_state.get('diet_future') is not None
+        if st.form_submit_button("Generate Meal Plan", type="primary", disabled=generating):
+            try:
+                # Get user's food inventory
+                available_foods = cached_user_foods(user['id'])
+                if not available_foods:
+                    st.info("No foods in your inventory. Using standard ingredients.")
+                    available_foods = ["chicken breast", "rice", "broccoli", "eggs", "oats", 
+                                     "salmon", "sweet potato", "spinach", "almonds", "Greek yogurt"]
+                
+                # Prepare user profile and dietary goals
+                user_profile = {
+                    'age': user.get('age'),
+                    'gender': user.get('gender'),
+                    'height_cm': user.get('height_cm'),
+                    'weight_kg': user.get('weight_kg'),
+                    'activity_level': user.get('activity_level'),
+                    'fitness_goals': user.get('fitness_goals')
+                }
+                
+                dietary_goals = {
+                    'name':name,
+                    'calorie_target': calorie_target,
+                    'protein_target': protein_target,
+                    'carb_target': carb_target,
+                    'fat_target': fat_target,
+                    'restrictions': dietary_restrictions,
+                    'meals_per_day': meals_per_day,
+                    'snacks_per_day': snacks_per_day,
+                    'cooking_time': cooking_time,
+                    'cuisine_preference': cuisine_preference
+                }
+                
+                # Build the prompt here, then generate and save the plan off the script thread
+                client = get_gemini_client()
+                prompt = client.create_diet_prompt(user_profile, available_foods, dietary_goals)
+                st.session_state.diet_future = _generation_pool().submit(
+                    _generate_and_save_diet_plan, client, prompt, user['id'], dietary_goals
+                )
                     
-                    if diet_plan:
-                        # Save to database
-                        plan_id = db.save_diet_plan(user['id'], diet_plan)
-                        if plan_id:
-                            st.success("🎉 Meal plan generated and saved successfully!")
-                            st.session_state.generated_diet = diet_plan
-                            display_diet_plan(diet_plan)
-                        else:
-                            st.error("Failed to save meal plan")
-                    else:
-                        st.error("Failed to generate meal plan")
-                        
-                except Exception as e:
-                    logger.error(f"Error generating diet plan: {e}")
-                    st.error(f"Error generating diet plan: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error generating diet plan: {e}")
+                st.error(f"Error generating diet plan: {str(e)}")
+    
+    # The polling fragment (and its run_every timer) only exists while a plan is pending
+    if st.session_state.get('diet_future') is not None:
+        poll_diet_generation(user['id'])
+    
+    # Show the outcome of a finished generation once
+    result = st.session_state.pop('diet_generation_result', None)
+    if result:
+        diet_plan, plan_id = result
+        if not diet_plan:
+            st.error("Failed to generate meal plan")
+        elif not plan_id:
+            st.error("Failed to save meal plan")
+        else:
+            st.success("🎉 Meal plan generated and saved successfully!")
+            st.session_state.generated_diet = diet_plan
+            display_diet_plan(diet_plan)
+
+@st.cache_resource
+def _generation_pool() -> ThreadPoolExecutor:
+    """Worker threads for meal plan generation, shared across sessions."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="diet-gen")
+
+def _generate_and_save_diet_plan(client: GeminiClient, prompt: str, user_id: int,
+                                 dietary_goals: Dict) -> Tuple[Optional[Dict], Optional[int]]:
+    """Generate a meal plan and save it; runs on a worker thread, so it must not call Streamlit."""
+    diet_plan = client.generate_diet_plan(prompt, dietary_goals)
+    plan_id = db.save_diet_plan(user_id, diet_plan) if diet_plan else None
+    return diet_plan, plan_id
 
+@st.fragment(run_every=1)
+def poll_diet_generation(user_id: int):
+    """Show progress for a pending meal plan and rerun the page once it is ready."""
+    future = st.session_state.get('diet_future')
+    if future is None:
+        return
+    if not future.done():
+        st.info("⏳ Creating your personalized meal plan...")
+        return
+    
+    st.session_state.diet_future = None
+    try:
+        st.session_state.diet_generation_result = future.result()
+    except Exception as e:
+        logger.error(f"Error generating diet plan: {e}")
+        st.session_state.diet_generation_result = (None, None)
+    cached_diet_plans.clear(user_id)
+    cached_dashboard.clear(user_id)
+    st.rerun()
+
+@st.fragment
 def render_my_diet_plans():
-    """Render saved diet plans."""
+    """Render saved diet plans; runs as a fragment so 'View Details' reruns only this tab."""
     st.subheader("📋 My Meal Plans")
     user_id = AuthManager.get_current_user_id()
     
-    diet_plans = db.get_user_diet_plans(user_id)
+    diet_plans = cached_diet_plans(user_id)
     
     if not diet_plans:
         st.info("No meal plans found. Generate your first plan in the 'Generate Plan' tab!")
         return
-    detail_button=[False,0]
     for plan in diet_plans:
         with st.expander(f"🍽️ {plan['name']} - {plan.get('calorie_target', 'N/A')} cal/day"):
             col1, col2 = st.columns([3, 1])
@@ -170,16 +204,24 @@ def render_my_diet_plans():
             with col2:
                 if st.button(f"View Details", key=f"view_diet_{plan['id']}"):
                     st.session_state.selected_diet_plan = plan['id']
-                    detail_button=[True,plan['id']]
                 
                 if st.button(f"Delete Plan", key=f"delete_diet_{plan['id']}", type="secondary"):
                     if delete_diet_plan(plan['id']):
+                        if st.session_state.get('selected_diet_plan') == plan['id']:
+                            st.session_state.selected_diet_plan = None
+                        cached_diet_plans.clear(user_id)
+                        cached_dashboard.clear(user_id)
                         st.success("Plan deleted successfully!")
                         st.rerun()
-        if(detail_button[0]):
-            show_diet_plan_details(detail_button[1])
+    
+    # Show details for the selected plan once, below the list
+    selected_plan = st.session_state.get('selected_diet_plan')
+    if any(plan['id'] == selected_plan for plan in diet_plans):
+        show_diet_plan_details(selected_plan)
+
+@st.fragment
 def render_food_inventory():
-    """Render food inventory management."""
+    """Render food inventory management; runs as a fragment so quick-add clicks rerun only this tab."""
     st.subheader("🛒 Food Inventory")
     user_id = AuthManager.get_current_user_id()
     
@@ -192,6 +234,7 @@ def render_food_inventory():
             if st.form_submit_button("Add Food"):
                 if new_food:
                     if db.add_food_to_inventory(user_id, new_food):
+                        cached_user_foods.clear(user_id)
                         st.success(f"Added {new_food} to your inventory!")
                         st.rerun()
                     else:
@@ -201,16 +244,26 @@ def render_food_inventory():
     
     with col2:
         st.markdown("**Quick Add**")
+        # Picks are queued in session state and written in one batch
+        pending_foods = st.session_state.setdefault('pending_foods', [])
         common_foods = ["Eggs", "Milk", "Bread", "Rice", "Pasta", "Chicken", "Beef", "Fish"]
         for food in common_foods:
-            if st.button(food, key=f"quick_{food}"):
-                if db.add_food_to_inventory(user_id, food):
-                    st.success(f"Added {food}!")
+            st.button(food, key=f"quick_{food}", disabled=food in pending_foods,
+                      on_click=pending_foods.append, args=(food,))
+        
+        if pending_foods:
+            st.caption(f"Pending: {', '.join(pending_foods)}")
+            if st.button("Commit additions", key="quick_commit", type="primary"):
+                if db.add_foods_to_inventory(user_id, pending_foods):
+                    cached_user_foods.clear(user_id)
+                    st.session_state.pending_foods = []
                     st.rerun()
+                else:
+                    st.error("Failed to add food items")
     
     # Display current inventory
     st.markdown("**Your Food Inventory**")
-    foods = db.get_user_foods(user_id)
+    foods = cached_user_foods(user_id)
     
     if foods:
         # Display in columns
@@ -223,8 +276,14 @@ def render_food_inventory():
     else:
         st.info("Your food inventory is empty. Add some items to get personalized meal plans!")
 
+@st.fragment
 def render_meal_logging():
-    """Render meal logging interface."""
+    """
+    Render meal logging interface.
+
+    Runs as a fragment together with today's nutrition summary, so the summary
+    is re-queried when a meal is logged but not on interactions in other tabs.
+    """
     st.subheader("📝 Log Today's Meals")
     
     user_id = AuthManager.get_current_user_id()
@@ -247,6 +306,7 @@ def render_meal_logging():
             if meal_description and calories > 0:
                 if db.log_meal_consumption(user_id, meal_type, meal_description, 
                                          calories, protein, carbs, fat):
+                    cached_dashboard.clear(user_id)
                     st.success("Meal logged successfully!")
                     st.balloons()
                 else:
@@ -262,40 +322,34 @@ def render_daily_nutrition_summary(user_id: int):
     st.markdown("### 📊 Today's Nutrition Summary")
     
     try:
-        # Get today's nutrition data
-        nutrition_df = db.get_nutrition_logs(user_id, "1 Week")
+        # Get today's nutrition totals; logged_on is derived from the UTC
+        # CURRENT_TIMESTAMP, so "today" has to be the UTC date as well
+        today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        today_nutrition = db.get_nutrition_for_date(user_id, today)
         
-        if not nutrition_df.empty:
-            today = datetime.now().strftime('%Y-%m-%d')
-            today_data = nutrition_df[nutrition_df['date'] == today]
+        if today_nutrition:
+            col1, col2, col3, col4 = st.columns(4)
             
-            if not today_data.empty:
-                today_nutrition = today_data.iloc[0]
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric("Calories", f"{int(today_nutrition['calories'])}")
-                
-                with col2:
-                    st.metric("Protein", f"{int(today_nutrition['protein'])}g")
-                
-                with col3:
-                    st.metric("Carbs", f"{int(today_nutrition['carbs'])}g")
-                
-                with col4:
-                    st.metric("Fat", f"{int(today_nutrition['fats'])}g")
-                
-                # Progress bars if targets are available
-                if 'target_calories' in today_nutrition:
-                    target = today_nutrition['target_calories']
-                    actual = today_nutrition['calories']
-                    progress = min(actual / target, 1.0) if target > 0 else 0
-                    st.progress(progress, text=f"Calorie Goal: {int(actual)}/{int(target)}")
-            else:
-                st.info("No meals logged today yet.")
+            with col1:
+                st.metric("Calories", f"{int(today_nutrition['calories'])}")
+            
+            with col2:
+                st.metric("Protein", f"{int(today_nutrition['protein'])}g")
+            
+            with col3:
+                st.metric("Carbs", f"{int(today_nutrition['carbs'])}g")
+            
+            with col4:
+                st.metric("Fat", f"{int(today_nutrition['fats'])}g")
+            
+            # Progress bars if targets are available
+            if today_nutrition['target_calories'] is not None:
+                target = today_nutrition['target_calories']
+                actual = today_nutrition['calories']
+                progress = min(actual / target, 1.0) if target > 0 else 0
+                st.progress(progress, text=f"Calorie Goal: {int(actual)}/{int(target)}")
         else:
-            st.info("No nutrition data available.")
+            st.info("No meals logged today yet.")
             
     except Exception as e:
         logger.error(f"Error displaying nutrition summary: {e}")
@@ -315,12 +369,9 @@ def display_diet_plan(plan):
         st.markdown(f"**Dietary Restrictions:** {plan.get('dietary_restrictions')}")
     
     # Group meals by day
-    meals_by_day = {}
+    meals_by_day = defaultdict(list)
     for meal in plan.get('meals', []):
-        day = meal.get('day_number', 1)
-        if day not in meals_by_day:
-            meals_by_day[day] = []
-        meals_by_day[day].append(meal)
+        meals_by_day[meal.get('day_number', 1)].append(meal)
     
     # Display meals by day
     for day in sorted(meals_by_day.keys()):
@@ -350,12 +401,9 @@ def display_diet_plan(plan):
         shopping_items = plan.get('shopping_list', [])
         
         # Group by category
-        by_category = {}
+        by_category = defaultdict(list)
         for item in shopping_items:
-            category = item.get('category', 'Other')
-            if category not in by_category:
-                by_category[category] = []
-            by_category[category].append(item)
+            by_category[item.get('category', 'Other')].append(item)
         
         for category, items in by_category.items():
             st.markdown(f"**{category}:**")
@@ -367,104 +415,87 @@ def display_diet_plan(plan):
 def show_diet_plan_details(plan_id: int):
     """Display detailed information for a specific diet plan."""
     try:
+        # Load the plan, its meals and its shopping list on one cursor
         with db.get_connection() as conn:
             cursor = conn.cursor()
-
-            # Get plan metadata
-            cursor.execute("""
+            plan = cursor.execute("""
                 SELECT * FROM diet_plans
                 WHERE id = ?
-            """, (plan_id,))
-            plan = cursor.fetchone()
+            """, (plan_id,)).fetchone()
             if not plan:
                 st.error("Diet plan not found")
                 return
 
-            st.header(f"🍲 {plan['name']}")
-            st.write(f"**Calorie Target:** {plan['calorie_target']}")
-            st.write(f"**Protein Target:** {plan['protein_target_g']}g")
-            st.write(f"**Carbs Target:** {plan['carb_target_g']}g")
-            st.write(f"**Fat Target:** {plan['fat_target_g']}g")
-            st.write(f"**Dietary Restrictions:** {plan['dietary_restrictions'] or 'None'}")
-            st.write(f"**Created:** {plan['created_at']}")
-            if plan['ai_generated']:
-                st.success("🤖 AI Generated")
-
-            # Get meal plan details
-            cursor.execute("""
+            meal_plans = cursor.execute("""
                 SELECT day_number, meal_type, recipe_name, ingredients,
                        instructions, calories_per_serving, protein_g, carbs_g,
                        fat_g, servings
                 FROM meal_plans
                 WHERE diet_plan_id = ?
                 ORDER BY day_number, meal_type
-            """, (plan_id,))
-            meal_plans = [dict(row) for row in cursor.fetchall()]
-
-            if not meal_plans:
-                st.info("No meal details found for this plan.")
-                return
-
-            # Group meals by day
-            days = {}
-            for meal in meal_plans:
-                day = meal['day_number']
-                if day not in days:
-                    days[day] = []
-                days[day].append(meal)
+            """, (plan_id,)).fetchall()
 
-            # Display each day's meals in tabs
-            day_tabs = st.tabs([f"Day {day}" for day in sorted(days.keys())])
-            for i, (day, meals) in enumerate(sorted(days.items())):
-                with day_tabs[i]:
-                    st.markdown(f"### Day {day}")
-                    for meal in meals:
-                        with st.expander(f"{meal['meal_type']}: {meal['recipe_name']}", expanded=False):
-                            st.write(f"**Ingredients:**")
-                            st.write(meal['ingredients'])
-                            st.write(f"**Instructions:**")
-                            st.write(meal['instructions'])
-                            st.write(f"**Servings:** {meal['servings']}")
-                            st.write(f"**Calories per serving:** {meal['calories_per_serving']}")
-                            st.write(f"**Protein:** {meal['protein_g']}g")
-                            st.write(f"**Carbs:** {meal['carbs_g']}g")
-                            st.write(f"**Fat:** {meal['fat_g']}g")
-
-            # Display shopping list if available
-            cursor.execute("""
+            shopping_list = cursor.execute("""
                 SELECT item_name, quantity, unit, category
                 FROM shopping_lists
                 WHERE diet_plan_id = ?
                 ORDER BY category, item_name
-            """, (plan_id,))
-            shopping_list = [dict(row) for row in cursor.fetchall()]
+            """, (plan_id,)).fetchall()
+
+        st.header(f"🍲 {plan['name']}")
+        st.write(f"**Calorie Target:** {plan['calorie_target']}")
+        st.write(f"**Protein Target:** {plan['protein_target_g']}g")
+        st.write(f"**Carbs Target:** {plan['carb_target_g']}g")
+        st.write(f"**Fat Target:** {plan['fat_target_g']}g")
+        st.write(f"**Dietary Restrictions:** {plan['dietary_restrictions'] or 'None'}")
+        st.write(f"**Created:** {plan['created_at']}")
+        if plan['ai_generated']:
+            st.success("🤖 AI Generated")
+
+        if not meal_plans:
+            st.info("No meal details found for this plan.")
+            return
 
-            if shopping_list:
-                with st.expander("🛒 Shopping List", expanded=False):
-                    categories = {}
-                    for item in shopping_list:
-                        cat = item['category']
-                        if cat not in categories:
-                            categories[cat] = []
-                        categories[cat].append(item)
-                    for category, items in categories.items():
-                        st.markdown(f"**{category}**")
-                        for item in items:
-                            st.write(f"- {item['item_name']}: {item['quantity']} {item['unit']}")
+        # Group meals by day
+        days = defaultdict(list)
+        for meal in meal_plans:
+            days[meal['day_number']].append(meal)
+
+        # Display each day's meals in tabs; rows already arrive in day order
+        day_tabs = st.tabs([f"Day {day}" for day in days])
+        for day_tab, (day, meals) in zip(day_tabs, days.items()):
+            with day_tab:
+                st.markdown(f"### Day {day}")
+                for meal in meals:
+                    with st.expander(f"{meal['meal_type']}: {meal['recipe_name']}", expanded=False):
+                        st.write(f"**Ingredients:**")
+                        st.write(meal['ingredients'])
+                        st.write(f"**Instructions:**")
+                        st.write(meal['instructions'])
+                        st.write(f"**Servings:** {meal['servings']}")
+                        st.write(f"**Calories per serving:** {meal['calories_per_serving']}")
+                        st.write(f"**Protein:** {meal['protein_g']}g")
+                        st.write(f"**Carbs:** {meal['carbs_g']}g")
+                        st.write(f"**Fat:** {meal['fat_g']}g")
+
+        # Display shopping list if available
+        if shopping_list:
+            with st.expander("🛒 Shopping List", expanded=False):
+                categories = defaultdict(list)
+                for item in shopping_list:
+                    categories[item['category']].append(item)
+                for category, items in categories.items():
+                    st.markdown(f"**{category}**")
+                    for item in items:
+                        st.write(f"- {item['item_name']}: {item['quantity']} {item['unit']}")
     except Exception as e:
         st.error(f"Error loading diet plan details: {e}")
 
 def delete_diet_plan(plan_id: int) -> bool:
     try:
         with db.get_connection() as conn:
-            cursor = conn.cursor()
-            # Delete related meal plans
-            cursor.execute("DELETE FROM meal_plans WHERE diet_plan_id = ?", (plan_id,))
-            # Delete related shopping list items
-            cursor.execute("DELETE FROM shopping_lists WHERE diet_plan_id = ?", (plan_id,))
-            # Delete the diet plan itself
-            cursor.execute("DELETE FROM diet_plans WHERE id = ?", (plan_id,))
-            conn.commit()
+            # Meals and shopping list items are removed by the trg_diet_plans_delete trigger
+            conn.execute("DELETE FROM diet_plans WHERE id = ?", (plan_id,))
         return True
     except Exception as e:
         logger.error(f"Error deleting diet plan {plan_id}: {e}")
@@ -3,18 +3,25 @@ Profile page for the Fitness Dashboard.
 Handles user profile management and editing.
 """
 import streamlit as st
+import json
 from modules.auth import AuthManager
 from modules.database import db
+from modules.cache import cached_user_foods, cached_diet_plans, cached_workout_plans
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Select box options and their positions, built once at import
+_ACTIVITY_LEVELS = ("Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Extremely Active")
+_GENDERS = ("Male", "Female", "Other", "Prefer not to say")
+_EXPERIENCE = ("Beginner", "Intermediate", "Advanced")
+_ACTIVITY_IDX = {value: i for i, value in enumerate(_ACTIVITY_LEVELS)}
+_GENDER_IDX = {value: i for i, value in enumerate(_GENDERS)}
+_EXPERIENCE_IDX = {value: i for i, value in enumerate(_EXPERIENCE)}
+
 def render_profile_content():
     """Render the profile page content."""
-    st.markdown('<div class="main-header">', unsafe_allow_html=True)
-    st.title("👤 User Profile")
-    st.markdown("Manage your personal information and fitness preferences")
-    st.markdown('</div>', unsafe_allow_html=True)
+    st.html('<div class="main-header"><h1>👤 User Profile</h1><p>Manage your personal information and fitness preferences</p></div>')
 
     user = AuthManager.get_current_user()
     if not user:
@@ -45,27 +52,21 @@ def render_profile_info(user):
                                        value=float(user.get('height_cm', 170)))
             activity_level = st.selectbox(
                 "Activity Level",
-                ["Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Extremely Active"],
-                index=["Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Extremely Active"]
-                     .index(user.get('activity_level', 'Moderately Active')) if user.get('activity_level') in 
-                     ["Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Extremely Active"] else 2
+                _ACTIVITY_LEVELS,
+                index=_ACTIVITY_IDX.get(user.get('activity_level'), 2)
             )
             
         with col2:
             last_name = st.text_input("Last Name", value=user.get('last_name', ''))
             email = st.text_input("Email", value=user.get('email', ''), disabled=True)
-            gender = st.selectbox("Gender", ["Male", "Female", "Other", "Prefer not to say"],
-                                 index=["Male", "Female", "Other", "Prefer not to say"]
-                                      .index(user.get('gender', 'Male')) if user.get('gender') in 
-                                      ["Male", "Female", "Other", "Prefer not to say"] else 0)
+            gender = st.selectbox("Gender", _GENDERS,
+                                 index=_GENDER_IDX.get(user.get('gender'), 0))
             weight_kg = st.number_input("Weight (kg)", min_value=30.0, max_value=300.0, 
                                        value=float(user.get('weight_kg', 70.0)))
             experience_level = st.selectbox(
                 "Fitness Experience",
-                ["Beginner", "Intermediate", "Advanced"],
-                index=["Beginner", "Intermediate", "Advanced"]
-                     .index(user.get('experience_level', 'Beginner')) if user.get('experience_level') in 
-                     ["Beginner", "Intermediate", "Advanced"] else 0
+                _EXPERIENCE,
+                index=_EXPERIENCE_IDX.get(user.get('experience_level'), 0)
             )
         
         fitness_goals = st.text_area("Fitness Goals", value=user.get('fitness_goals', ''),
@@ -91,7 +92,7 @@ def render_profile_info(user):
                 st.success("Profile updated successfully!")
                 # Update session state
                 updated_user = {**user, **profile_data}
-                st.session_state.user_data = updated_user
+                AuthManager.update_user_data(updated_user)
                 st.rerun()
             else:
                 st.error("Failed to update profile")
@@ -105,19 +106,17 @@ def render_account_settings(user):
     st.info(f"**User ID:** {user.get('id')}")
     
     # Quick stats
+    workout_count, diet_count, food_count = db.get_user_counts(user['id'])
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        workout_plans = db.get_user_workout_plans(user['id'])
-        st.metric("Workout Plans", len(workout_plans))
+        st.metric("Workout Plans", workout_count)
     
     with col2:
-        diet_plans = db.get_user_diet_plans(user['id'])
-        st.metric("Diet Plans", len(diet_plans))
+        st.metric("Diet Plans", diet_count)
     
     with col3:
-        foods = db.get_user_foods(user['id'])
-        st.metric("Food Items", len(foods))
+        st.metric("Food Items", food_count)
     
     st.markdown("---")
     
@@ -132,14 +131,15 @@ def render_account_settings(user):
                 # Create export data
                 export_data = {
                     'profile': dict(user),
-                    'workout_plans': workout_plans,
-                    'diet_plans': diet_plans,
-                    'food_inventory': foods
+                    'workout_plans': cached_workout_plans(user['id']),
+                    'diet_plans': cached_diet_plans(user['id']),
+                    'food_inventory': cached_user_foods(user['id'])
                 }
                 
+                payload = json.dumps(export_data, default=str, separators=(",", ":")).encode("utf-8")
                 st.download_button(
                     label="Download Data (JSON)",
-                    data=str(export_data),
+                    data=payload,
                     file_name=f"fittrack_data_{user['username']}.json",
                     mime="application/json"
                 )
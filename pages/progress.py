@@ -1,26 +1,29 @@
 """Progress tracking page for the Fitness Dashboard."""
 import streamlit as st
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from modules.database import db
 from modules.auth import AuthManager
-from typing import Dict, List, Any
+from modules.cache import cached_body_metrics, cached_dashboard
+from typing import TYPE_CHECKING, Dict, List, Any
 import logging
 
+if TYPE_CHECKING:
+    import altair as alt
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# BMI category thresholds drawn on the BMI chart: (upper bound, color, label)
+_BMI_BANDS = ((18.5, 'blue', 'Underweight'), (25, 'green', 'Normal'), (30, 'orange', 'Overweight'))
+
 def render_progress_content():
     """Render the progress tracking page content."""
-    st.markdown('<div class="main-header">', unsafe_allow_html=True)
-    st.title("📊 Progress Tracking")
-    st.markdown("Monitor your fitness journey with detailed analytics")
-    st.markdown('</div>', unsafe_allow_html=True)
+    st.html('<div class="main-header"><h1>📊 Progress Tracking</h1><p>Monitor your fitness journey with detailed analytics</p></div>')
 
-    user_id = AuthManager.get_current_user_id()
-    if not user_id:
+    user = AuthManager.get_current_user()
+    if not user:
         st.error("Please log in to view progress")
         return
 
@@ -30,16 +33,18 @@ def render_progress_content():
     ])
     
     with overview_tab:
-        render_progress_overview()
+        render_progress_overview(user)
     
     with body_tab:
-        render_body_metrics()
+        render_body_metrics(user)
     
-def render_progress_overview():
+def render_progress_overview(user: Dict):
     """Render progress overview dashboard."""
     st.subheader("🎯 Progress Overview")
-    user_id = AuthManager.get_current_user_id()
-    user = AuthManager.get_current_user()
+    user_id = user['id']
+    
+    # Load everything the overview needs in one concurrent round
+    dashboard = cached_dashboard(user_id)
     
     # Current stats
     col1, col2, col3, col4 = st.columns(4)
@@ -55,26 +60,21 @@ def render_progress_overview():
         st.metric("BMI", f"{bmi:.1f}" if bmi else "N/A")
     
     with col4:
-        workout_plans = db.get_user_workout_plans(user_id)
-        st.metric("Workout Plans", len(workout_plans))
+        st.metric("Workout Plans", len(dashboard['workout_plans']))
     
     # Quick insights
     st.markdown("### 💡 Quick Insights")
     
-    # Get recent progress data
-    body_metrics = db.get_body_metrics(user_id)
-    workout_history = db.get_workout_history(user_id, "1 Month")
-    nutrition_logs = db.get_nutrition_logs(user_id, "1 Week")
-    
-    insights = generate_insights(body_metrics, workout_history, nutrition_logs, user)
+    insights = generate_insights(dashboard['body_metrics'], dashboard['workout_history'],
+                                 dashboard['nutrition_logs'], user)
     
     for insight in insights:
         st.info(insight)
 
-def render_body_metrics():
+def render_body_metrics(user: Dict):
     """Render body metrics tracking."""
     st.subheader("⚖️ Body Metrics")
-    user_id = AuthManager.get_current_user_id()
+    user_id = user['id']
     
     # Add new measurement
     st.markdown("**Log New Measurement**")
@@ -92,32 +92,29 @@ def render_body_metrics():
         
         if st.form_submit_button("Log Measurement", type="primary"):
             if db.add_progress_entry(user_id, weight_kg, height_cm,measurement_date):
+                cached_body_metrics.clear(user_id)
+                cached_dashboard.clear(user_id)
                 st.success("Measurement logged successfully!")
                 st.rerun()
             else:
                 st.error("Failed to log measurement")
     
     # Display progress charts
-    body_metrics = db.get_body_metrics(user_id)
+    body_metrics = cached_body_metrics(user_id)
     
     if body_metrics:
+        # Rows are already ordered by date (SQL_SELECT_BODY_METRICS)
         df = pd.DataFrame(body_metrics)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date')
+        df['date'] = pd.to_datetime(df['date'], format='ISO8601')
         
         # Weight progress chart
         st.markdown("**Weight Progress**")
         if len(df) > 1:
-            fig, ax = plt.subplots(figsize=(10, 4))
-            ax.plot(df['date'], df['weight_kg'], marker='o', linewidth=2)
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Weight (kg)")
-            ax.set_title("Weight Trend")
-            ax.grid(True, alpha=0.3)
-            st.pyplot(fig)
+            st.line_chart(df.set_index('date')['weight_kg'], x_label="Date", y_label="Weight (kg)")
             
             # Weight change summary
-            weight_change = df['weight_kg'].iloc[-1] - df['weight_kg'].iloc[0]
+            weights = df['weight_kg']
+            weight_change = weights.iat[-1] - weights.iat[0]
             change_color = "green" if weight_change < 0 else "red"
             st.markdown(f"**Total change:** <span style='color:{change_color}'>{weight_change:+.1f} kg</span>", 
                        unsafe_allow_html=True)
@@ -126,28 +123,35 @@ def render_body_metrics():
         
         # BMI tracking
         if 'height_cm' in df.columns:
-            df['bmi'] = df.apply(lambda row: calculate_bmi(row['weight_kg'], row['height_cm']), axis=1)
+            # Column-wise BMI; rows without a height are left as NaN
+            height_m = df['height_cm'].to_numpy(dtype=float) / 100
+            df['bmi'] = np.divide(df['weight_kg'].to_numpy(dtype=float), height_m ** 2,
+                                  out=np.full(len(df), np.nan), where=height_m > 0)
             
             st.markdown("**BMI Progress**")
             if len(df) > 1:
-                fig, ax = plt.subplots(figsize=(10, 4))
-                ax.plot(df['date'], df['bmi'], marker='o', linewidth=2, color='orange')
-                ax.set_xlabel("Date")
-                ax.set_ylabel("BMI")
-                ax.set_title("BMI Trend")
-                ax.grid(True, alpha=0.3)
-                
-                # Add BMI categories
-                ax.axhline(y=18.5, color='blue', linestyle='--', alpha=0.5, label='Underweight')
-                ax.axhline(y=25, color='green', linestyle='--', alpha=0.5, label='Normal')
-                ax.axhline(y=30, color='orange', linestyle='--', alpha=0.5, label='Overweight')
-                ax.legend()
-                
-                st.pyplot(fig)
+                st.altair_chart(_bmi_chart(df[['date', 'bmi']]))
     else:
         st.info("No body measurements recorded yet. Log your first measurement above!")
 
 
+def _bmi_chart(df: pd.DataFrame) -> "alt.LayerChart":
+    """BMI trend line with the category thresholds drawn as dashed rules."""
+    import altair as alt  # deferred: only needed once there is BMI history to plot
+    
+    line = alt.Chart(df).mark_line(point=True, color='orange').encode(
+        x=alt.X('date:T', title="Date"),
+        y=alt.Y('bmi:Q', title="BMI")
+    )
+    
+    # Add BMI categories
+    bands = pd.DataFrame(_BMI_BANDS, columns=['bmi', 'color', 'label'])
+    rules = alt.Chart(bands).mark_rule(strokeDash=[4, 4], opacity=0.5).encode(
+        y='bmi:Q',
+        color=alt.Color('label:N', title="Category",
+                        scale=alt.Scale(domain=list(bands['label']), range=list(bands['color'])))
+    )
+    return alt.layer(line, rules).properties(title="BMI Trend")
 
 def calculate_bmi(weight_kg: float, height_cm: float) -> float:
     """Calculate BMI from weight and height."""
@@ -163,8 +167,8 @@ def generate_insights(body_metrics: List[Dict], workout_data: pd.DataFrame,
     
     # Body metrics insights
     if len(body_metrics) >= 2:
-        df = pd.DataFrame(body_metrics)
-        weight_trend = df['weight_kg'].iloc[-1] - df['weight_kg'].iloc[0]
+        # Metrics arrive ordered by date from the database
+        weight_trend = body_metrics[-1]['weight_kg'] - body_metrics[0]['weight_kg']
         
         if weight_trend < -1:
             insights.append(f"🎉 Great progress! You've lost {abs(weight_trend):.1f} kg since you started tracking.")
@@ -175,7 +179,7 @@ def generate_insights(body_metrics: List[Dict], workout_data: pd.DataFrame,
     
     # Workout insights
     if not workout_data.empty:
-        avg_sessions = workout_data['sessions'].mean()
+        avg_sessions = np.nanmean(workout_data['sessions'].to_numpy(dtype=float))
         if avg_sessions >= 4:
             insights.append("💪 Excellent workout consistency! You're averaging 4+ sessions per week.")
         elif avg_sessions >= 2:
@@ -185,8 +189,8 @@ def generate_insights(body_metrics: List[Dict], workout_data: pd.DataFrame,
     
     # Nutrition insights
     if not nutrition_data.empty and 'target_calories' in nutrition_data.columns:
-        target = nutrition_data['target_calories'].iloc[0]
-        avg_intake = nutrition_data['calories'].mean()
+        target = nutrition_data['target_calories'].iat[0]
+        avg_intake = np.nanmean(nutrition_data['calories'].to_numpy(dtype=float))
         adherence = (avg_intake / target) * 100
         
         if 90 <= adherence <= 110:
@@ -4,20 +4,29 @@ Handles workout plan generation, viewing, and logging.
 """
 import streamlit as st
 import json
+from itertools import groupby
+from operator import itemgetter
 from datetime import datetime, timedelta
 from modules.auth import AuthManager
 from modules.database import db
-from modules.ai_integration import gemini_client
+from modules.cache import cached_workout_plans, cached_day_exercises, cached_dashboard
+from modules.ai_integration import get_gemini_client
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Canned AI coach prompts; answers are memoized by _cached_generate on the full prompt
+_QUICK_QUESTIONS = (
+    "How can I improve my bench press?",
+    "What's the best way to lose weight?",
+    "How often should I workout?",
+    "Should I do cardio before or after weights?",
+    "How do I avoid workout plateaus?"
+)
+
 def render_workouts_content():
     """Render the workouts page content."""
-    st.markdown('<div class="main-header">', unsafe_allow_html=True)
-    st.title("💪 Workout Plans")
-    st.markdown("AI-powered personalized workout planning and tracking")
-    st.markdown('</div>', unsafe_allow_html=True)
+    st.html('<div class="main-header"><h1>💪 Workout Plans</h1><p>AI-powered personalized workout planning and tracking</p></div>')
 
     user = AuthManager.get_current_user()
     if not user:
@@ -28,22 +37,21 @@ def render_workouts_content():
     generate_tab, my_plans_tab, logging_tab ,ai_coach= st.tabs(["Generate Plan", "My Plans", "Log Workout", "AI Coach"])
     
     with generate_tab:
-        render_workout_generator()
+        render_workout_generator(user)
     
     with my_plans_tab:
-        render_my_workout_plans()
+        render_my_workout_plans(user)
     
     with logging_tab:
-        render_workout_logging()
+        render_workout_logging(user)
     with ai_coach:
         render_ai_coach(user)
 
-def render_workout_generator():
+def render_workout_generator(user):
     """Render workout plan generator."""
     st.subheader("🤖 AI Workout Plan Generator")
-    user = AuthManager.get_current_user()
     
-    if not gemini_client.is_available():
+    if not get_gemini_client().is_available():
         st.warning("AI integration is not available. Please configure GEMINI_API_KEY in your environment.")
         return
     
@@ -105,12 +113,14 @@ def render_workout_generator():
                     }
                     
                     # Generate workout plan
-                    workout_plan = gemini_client.generate_workout_plan(user_profile, preferences)
+                    workout_plan = get_gemini_client().generate_workout_plan(user_profile, preferences)
                     
                     if workout_plan:
                         # Save to database
                         plan_id = db.save_workout_plan(user['id'], workout_plan)
                         if plan_id:
+                            cached_workout_plans.clear(user['id'])
+                            cached_dashboard.clear(user['id'])
                             st.success("🎉 Workout plan generated and saved successfully!")
                             st.session_state.generated_workout = workout_plan
                             display_workout_plan(workout_plan)
@@ -123,20 +133,24 @@ def render_workout_generator():
                     logger.error(f"Error generating workout plan: {e}")
                     st.error(f"Error generating workout plan: {str(e)}")
 
-def render_my_workout_plans():
+def render_my_workout_plans(user):
     """Render saved workout plans."""
-    user_id = AuthManager.get_current_user_id()
+    user_id = user['id']
     
     st.subheader("Your Workout Plans")
     
-    workout_plans = db.get_user_workout_plans(user_id)
+    workout_plans = cached_workout_plans(user_id)
     
     if not workout_plans:
         st.info("You don't have any workout plans yet. Generate your first plan in the 'Generate New Plan' tab!")
         return
     
+    # Ids of plans whose details are expanded
+    shown_plans = st.session_state.setdefault('shown_plans', set())
+    
     # Display workout plans
     for plan in workout_plans:
+        plan_id = plan['id']
         with st.container():
             col1, col2 = st.columns([3, 1])
             
@@ -149,38 +163,38 @@ def render_my_workout_plans():
                     st.success("🤖 AI Generated")
             
             with col2:
-                if st.button(f"View Details", key=f"view_{plan['id']}"):
-                    current_state = st.session_state.get(f"show_plan_{plan['id']}", False)
-                    st.session_state[f"show_plan_{plan['id']}"] = not current_state
+                st.button(f"View Details", key=f"view_{plan_id}",
+                          on_click=shown_plans.symmetric_difference_update, args=({plan_id},))
                 
-                if st.button(f"Delete Plan", key=f"delete_{plan['id']}", type="secondary"):
-                    if delete_workout_plan(plan['id']):
+                if st.button(f"Delete Plan", key=f"delete_{plan_id}", type="secondary"):
+                    if delete_workout_plan(plan_id):
+                        shown_plans.discard(plan_id)
+                        cached_workout_plans.clear(user_id)
+                        cached_dashboard.clear(user_id)
                         st.success("Plan deleted successfully!")
                         st.rerun()
             
             # Show plan details if requested (outside the main container)
-            if st.session_state.get(f"show_plan_{plan['id']}", False):
-                show_workout_plan_details(plan['id'])
+            if plan_id in shown_plans:
+                show_workout_plan_details(plan_id)
         
 
-def render_workout_logging():
-    """Render workout logging interface."""    
-    user_id = AuthManager.get_current_user_id()
+@st.fragment
+def render_workout_logging(user):
+    """Render workout logging interface; runs as a fragment so picking a plan or day reruns only this tab."""
+    user_id = user['id']
     st.subheader("Log Your Workout")
     
     # Get user's workout plans
-    workout_plans = db.get_user_workout_plans(user_id)
+    workout_plans = cached_workout_plans(user_id)
     
     if not workout_plans:
         st.info("Create a workout plan first to log your workouts!")
         return
     
     # Select workout plan and day
-    plan_names = [f"{plan['name']} (Created: {plan['created_at'][:10]})" for plan in workout_plans]
-    selected_plan_idx = st.selectbox("Select workout plan", range(len(plan_names)), 
-                                   format_func=lambda x: plan_names[x])
-    
-    selected_plan = workout_plans[selected_plan_idx]
+    selected_plan = st.selectbox("Select workout plan", workout_plans,
+                                 format_func=lambda plan: f"{plan['name']} (Created: {plan['created_at'][:10]})")
     
     # Get workout days for selected plan
     try:
@@ -192,11 +206,8 @@ def render_workout_logging():
             workout_days = [dict(row) for row in cursor.fetchall()]
         
         if workout_days:
-            day_names = [f"Day {day['day_number']}: {day['day_name']}" for day in workout_days]
-            selected_day_idx = st.selectbox("Select workout day", range(len(day_names)),
-                                          format_func=lambda x: day_names[x])
-            
-            selected_day = workout_days[selected_day_idx]
+            selected_day = st.selectbox("Select workout day", workout_days,
+                                        format_func=lambda day: f"Day {day['day_number']}: {day['day_name']}")
             
             # Log workout form
             with st.form("log_workout"):
@@ -207,13 +218,7 @@ def render_workout_logging():
                 notes = st.text_area("Workout notes")
                 
                 # Get exercises for this day
-                cursor.execute("""
-                    SELECT e.*, we.sets, we.reps, we.weight_kg, we.rest_seconds, we.notes as exercise_notes
-                    FROM exercises e
-                    JOIN workout_exercises we ON e.id = we.exercise_id
-                    WHERE we.workout_day_id = ?
-                """, (selected_day['id'],))
-                exercises = [dict(row) for row in cursor.fetchall()]
+                exercises = cached_day_exercises(selected_day['id'])
                 
                 st.markdown("#### Exercise Performance")
                 exercise_logs = []
@@ -251,33 +256,36 @@ def render_workout_logging():
                     })
                 
                 if st.form_submit_button("Log Workout", use_container_width=True):
-                    # Save workout log
+                    # Save the workout log and its exercise logs as one transaction
                     try:
-                        cursor.execute("""
-                            INSERT INTO workout_logs (user_id, workout_day_id, duration_minutes, notes)
-                            VALUES (?, ?, ?, ?)
-                        """, (user_id, selected_day['id'], duration, notes))
-                        
-                        workout_log_id = cursor.lastrowid
-                        
-                        # Save exercise logs
-                        for exercise_log in exercise_logs:
+                        with db.get_connection() as conn:
+                            cursor = conn.cursor()
+                            if not conn.in_transaction:
+                                conn.execute("BEGIN IMMEDIATE")
+                            
                             cursor.execute("""
+                                INSERT INTO workout_logs (user_id, plan_name, workout_day_id, duration_minutes, notes)
+                                VALUES (?, ?, ?, ?, ?)
+                            """, (user_id, selected_plan['name'], selected_day['id'], duration, notes))
+                            
+                            workout_log_id = cursor.lastrowid
+                            
+                            # Save exercise logs
+                            cursor.executemany("""
                                 INSERT INTO exercise_logs (workout_log_id, exercise_id, sets_completed,
-                                                         reps_completed, weight_used_kg, perceived_exertion, notes)
-                                VALUES (?, ?, ?, ?, ?, ?, ?)
-                            """, (workout_log_id, exercise_log['exercise_id'], 
-                                 exercise_log['sets_completed'], exercise_log['reps_completed'],
-                                 exercise_log['weight_used_kg'], exercise_log['perceived_exertion'],
-                                 exercise_log['notes']))
+                                                         reps_completed, reps_int, weight_used_kg,
+                                                         perceived_exertion, notes)
+                                VALUES (?, ?, ?, ?, CAST(? AS INTEGER), ?, ?, ?)
+                            """, [(workout_log_id, exercise_log['exercise_id'], 
+                                   exercise_log['sets_completed'], exercise_log['reps_completed'],
+                                   exercise_log['reps_completed'],
+                                   exercise_log['weight_used_kg'], exercise_log['perceived_exertion'],
+                                   exercise_log['notes'])
+                                  for exercise_log in exercise_logs])
                         
-                        conn.commit()
+                        cached_dashboard.clear(user_id)
                         st.success("Workout logged successfully! 🎉")
                         
-                        # Log progress metrics
-                        db.log_progress(user_id, 'workout_completed', 1, 'count', 
-                                      f"Completed: {selected_day['day_name']}")
-                        
                     except Exception as e:
                         st.error(f"Error logging workout: {e}")
         
@@ -316,16 +324,23 @@ def display_workout_plan(plan):
                     st.markdown(f"Reps: {exercise.get('reps')}")
                     if exercise.get('rest_seconds'):
                         st.markdown(f"Rest: {exercise.get('rest_seconds')}s")
+@st.fragment
 def render_ai_coach(user):
-    """Render AI coaching interface."""
+    """Render AI coaching interface; runs as a fragment so chat interactions rerun only this tab."""
     st.subheader("🤖 AI Fitness Coach")
     
-    if not gemini_client.is_available():
+    if not get_gemini_client().is_available():
         st.warning("AI Coach is not available. Please configure GEMINI_API_KEY.")
         return
     
     st.markdown("Ask your AI fitness coach anything about workouts, nutrition, or fitness goals!")
     
+    user_context = {
+        'fitness_goals': user.get('fitness_goals'),
+        'experience_level': user.get('experience_level'),
+        'current_focus': 'General fitness coaching'
+    }
+    
     # Chat interface
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
@@ -351,14 +366,8 @@ def render_ai_coach(user):
                 })
                 
                 # Get AI response
-                user_context = {
-                    'fitness_goals': user.get('fitness_goals'),
-                    'experience_level': user.get('experience_level'),
-                    'current_focus': 'General fitness coaching'
-                }
-                
-                with st.spinner("AI Coach is thinking..."):
-                    response = gemini_client.get_fitness_advice(question, user_context)
+                st.markdown("**AI Coach:**")
+                response = st.write_stream(get_gemini_client().get_fitness_advice_stream(question, user_context))
                 
                 if response:
                     st.session_state.chat_history.append({
@@ -366,25 +375,17 @@ def render_ai_coach(user):
                         "content": response
                     })
                 
-                st.rerun()
+                st.rerun(scope="fragment")
     
     with col2:
         if st.button("Clear Chat"):
             st.session_state.chat_history = []
-            st.rerun()
+            st.rerun(scope="fragment")
     
     # Quick question buttons
     st.markdown("#### Quick Questions")
-    quick_questions = [
-        "How can I improve my bench press?",
-        "What's the best way to lose weight?",
-        "How often should I workout?",
-        "Should I do cardio before or after weights?",
-        "How do I avoid workout plateaus?"
-    ]
-    
     cols = st.columns(2)
-    for i, q in enumerate(quick_questions):
+    for i, q in enumerate(_QUICK_QUESTIONS):
         with cols[i % 2]:
             if st.button(q, key=f"quick_{i}"):
                 st.session_state.chat_history.append({
@@ -392,14 +393,8 @@ def render_ai_coach(user):
                     "content": q
                 })
                 
-                user_context = {
-                    'fitness_goals': user.get('fitness_goals'),
-                    'experience_level': user.get('experience_level'),
-                    'current_focus': 'General fitness coaching'
-                }
-                
                 with st.spinner("AI Coach is thinking..."):
-                    response = gemini_client.get_fitness_advice(q, user_context)
+                    response = get_gemini_client().get_fitness_advice(q, user_context)
                 
                 if response:
                     st.session_state.chat_history.append({
@@ -407,7 +402,8 @@ def render_ai_coach(user):
                         "content": response
                     })
                 
-                st.rerun()
+                st.rerun(scope="fragment")
+
 def show_workout_plan_details(plan_id):
     """Show detailed view of a workout plan (styled like display_workout_plan)."""
     try:
@@ -427,24 +423,24 @@ def show_workout_plan_details(plan_id):
                 st.markdown(f"**Duration:** {plan.get('duration_weeks')} weeks")
                 st.markdown("---")
 
-            # Get workout days
-            cursor.execute("""
-                SELECT * FROM workout_days WHERE workout_plan_id = ?
-            """, (plan_id,))
-            workout_days = [dict(row) for row in cursor.fetchall()]
+            # Get workout days and their exercises in one query
+            rows = cursor.execute("""
+                SELECT wd.id AS day_id, wd.day_number, wd.day_name, wd.focus_area,
+                       we.id AS workout_exercise_id, e.name, e.instructions,
+                       we.sets, we.reps, we.weight_kg, we.rest_seconds, we.notes
+                FROM workout_days wd
+                LEFT JOIN workout_exercises we ON we.workout_day_id = wd.id
+                LEFT JOIN exercises e ON e.id = we.exercise_id
+                WHERE wd.workout_plan_id = ?
+                ORDER BY wd.day_number, wd.id, we.id
+            """, (plan_id,)).fetchall()
 
-            # Get exercises for each day
-            day_exercise_data = []
-            for day in workout_days:
-                cursor.execute("""
-                    SELECT e.*, we.sets, we.reps, we.weight_kg, we.rest_seconds, we.notes
-                    FROM exercises e
-                    JOIN workout_exercises we ON e.id = we.exercise_id
-                    WHERE we.workout_day_id = ?
-                """, (day['id'],))
-                exercises = [dict(row) for row in cursor.fetchall()]
-                day['exercises'] = exercises
-                day_exercise_data.append(day)
+        day_exercise_data = []
+        for _, day_rows in groupby(rows, key=itemgetter('day_id')):
+            day_rows = list(day_rows)
+            day = dict(day_rows[0])
+            day['exercises'] = [dict(row) for row in day_rows if row['workout_exercise_id'] is not None]
+            day_exercise_data.append(day)
 
         # Display workout days with expanders and two-column exercise layout
         for day in day_exercise_data:
@@ -475,17 +471,13 @@ def delete_workout_plan(plan_id):
     """Delete a workout plan and all related data."""
     try:
         with db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Delete in correct order due to foreign key constraints
-            cursor.execute("DELETE FROM exercise_logs WHERE workout_log_id IN (SELECT id FROM workout_logs WHERE workout_day_id IN (SELECT id FROM workout_days WHERE workout_plan_id = ?))", (plan_id,))
-            cursor.execute("DELETE FROM workout_logs WHERE workout_day_id IN (SELECT id FROM workout_days WHERE workout_plan_id = ?)", (plan_id,))
-            cursor.execute("DELETE FROM workout_exercises WHERE workout_day_id IN (SELECT id FROM workout_days WHERE workout_plan_id = ?)", (plan_id,))
-            cursor.execute("DELETE FROM workout_days WHERE workout_plan_id = ?", (plan_id,))
-            cursor.execute("DELETE FROM workout_plans WHERE id = ?", (plan_id,))
-            
-            conn.commit()
-            return True
+            day_ids = [row[0] for row in conn.execute(
+                "SELECT id FROM workout_days WHERE workout_plan_id = ?", (plan_id,))]
+            # Days, exercises, logs and exercise logs are removed by the trg_workout_*_delete triggers
+            conn.execute("DELETE FROM workout_plans WHERE id = ?", (plan_id,))
+        for day_id in day_ids:
+            cached_day_exercises.clear(day_id)
+        return True
     except Exception as e:
         logger.error(f"Error deleting workout plan: {e}")
         return False